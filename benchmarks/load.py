@@ -0,0 +1,208 @@
+"""Сквозной бенчмарк: реальный Dispatcher из main.py под синтетической нагрузкой.
+
+Бот работает против заглушек Bot API и ЮKassa (devtools) и локальной MySQL.
+Используйте отдельную базу — сценарии создают пользователей, платежи и отзывы.
+
+    MYSQL_DATABASE=land_course_bench python -m benchmarks.load --users 500
+    python -m benchmarks.load --scenarios start,reviews --users 1000 --concurrency 100 --json out.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+TELEGRAM_PORT = 8091
+YOOKASSA_PORT = 8092
+
+# Конфигурация читается при импорте main — выставляем окружение заранее
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("MYSQL_DATABASE", "land_course_bench")
+os.environ.setdefault("TELEGRAM_API_URL", f"http://127.0.0.1:{TELEGRAM_PORT}")
+os.environ.setdefault("YOOKASSA_API_URL", f"http://127.0.0.1:{YOOKASSA_PORT}/v3")
+os.environ.setdefault("WEB_SERVER_ENABLED", "0")
+os.environ.setdefault("METRICS_ENABLED", "0")
+
+from devtools.fake_telegram import (FakeBotAPI, make_callback_update, make_join_request_update,
+                                    make_message_update)
+from devtools.fake_yookassa import FakeYooKassaAPI
+
+# Тексты, без которых хендлеры сценариев не отвечают
+REQUIRED_MESSAGES = ("Начать", "Согласие на обработку данных", "Отзывы о гайде", "Подробнее")
+REVIEWS_COUNT = 25
+
+
+def _start(user_id: int) -> list[dict]:
+    return [make_message_update(user_id, "/start")]
+
+
+def _funnel(user_id: int) -> list[dict]:
+    return [
+        make_callback_update(user_id, "buy"),
+        make_callback_update(user_id, "consent_data"),
+        make_callback_update(user_id, "consent_offer"),
+        make_callback_update(user_id, "proceed_to_payment"),
+        make_message_update(user_id, f"user{user_id}@example.com"),
+    ]
+
+
+def _reviews(user_id: int) -> list[dict]:
+    return [make_callback_update(user_id, "reviews")]
+
+
+def _join(user_id: int) -> list[dict]:
+    from config import config
+    return [make_join_request_update(user_id, int(config.CHANNEL_ID))]
+
+
+# Сценарий -> последовательность обновлений одного пользователя
+SCENARIOS = {
+    "start": _start,
+    "funnel": _funnel,
+    "reviews": _reviews,
+    "join": _join,
+}
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def seed_database():
+    from services import database, commands
+
+    for title in REQUIRED_MESSAGES:
+        await database.execute(
+            "INSERT IGNORE INTO messages (title, text) VALUES (%s, %s)",
+            (title, f"Текст «{title}» для бенчмарка")
+        )
+    for i in range(REVIEWS_COUNT):
+        await database.execute(
+            "INSERT IGNORE INTO reviews (photo_url) VALUES (%s)", (f"benchmark_review_{i}",)
+        )
+    await commands.load_messages()
+
+
+async def run_scenario(name: str, users: list[int], concurrency: int, bot_api: FakeBotAPI) -> dict:
+    import main
+    from aiogram.types import Update
+    from services import database
+    from services.registration import registration_buffer
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def drive(user_id: int):
+        nonlocal errors
+        async with semaphore:
+            # Обновления одного пользователя идут по порядку, как в Telegram
+            for raw in SCENARIOS[name](user_id):
+                update = Update.model_validate(raw, context={"bot": main.bot})
+                started = time.perf_counter()
+                try:
+                    await main.dp.feed_update(main.bot, update)
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+    queries_before = database.query_count
+    api_calls_before = sum(bot_api.calls.values())
+    started = time.perf_counter()
+    await asyncio.gather(*(drive(user_id) for user_id in users))
+    # Отложенная запись регистраций — часть стоимости /start
+    await registration_buffer.flush()
+    elapsed = time.perf_counter() - started
+
+    updates = len(latencies)
+    return {
+        "scenario": name,
+        "updates": updates,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_ups": round(updates / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "db_queries_per_update": round((database.query_count - queries_before) / max(updates, 1), 2),
+        "bot_api_calls_per_update": round(
+            (sum(bot_api.calls.values()) - api_calls_before) / max(updates, 1), 2
+        ),
+    }
+
+
+def format_report(results: list[dict]) -> str:
+    header = f"{'сценарий':<10}{'upd':>7}{'ош.':>5}{'upd/s':>9}{'p50 мс':>9}{'p95 мс':>9}{'p99 мс':>9}{'БД/upd':>8}{'API/upd':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['scenario']:<10}{r['updates']:>7}{r['errors']:>5}{r['throughput_ups']:>9}"
+            f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+            f"{r['db_queries_per_update']:>8}{r['bot_api_calls_per_update']:>9}"
+        )
+    return "\n".join(lines)
+
+
+@asynccontextmanager
+async def bot_harness(api_latency: float = 0.0):
+    """Запускает заглушки и бота из main.py; отдаёт заглушку Bot API"""
+    import main
+
+    bot_api = FakeBotAPI(latency=api_latency)
+    yookassa_api = FakeYooKassaAPI(latency=api_latency)
+    runners = [
+        await bot_api.start(port=TELEGRAM_PORT),
+        await yookassa_api.start(port=YOOKASSA_PORT),
+    ]
+    await main.dp.emit_startup(bot=main.bot)
+    try:
+        await seed_database()
+        yield bot_api
+    finally:
+        await main.dp.emit_shutdown(bot=main.bot)
+        await main.bot.session.close()
+        for runner in runners:
+            await runner.cleanup()
+
+
+async def _main(args) -> list[dict]:
+    async with bot_harness(args.api_latency) as bot_api:
+        # Свежие user_id на каждый запуск, чтобы воронка шла с начала
+        base = args.user_base or int(time.time()) * 1000
+        results = []
+        for index, name in enumerate(args.scenarios):
+            users = [base + index * args.users + i for i in range(args.users)]
+            results.append(await run_scenario(name, users, args.concurrency, bot_api))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"через запятую: {', '.join(SCENARIOS)}")
+    parser.add_argument("--users", type=int, default=200, help="пользователей на сценарий")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--api-latency", type=float, default=0.0,
+                        help="искусственная задержка заглушек Bot API и ЮKassa, сек")
+    parser.add_argument("--user-base", type=int, default=0, help="первый user_id (по умолчанию от времени)")
+    parser.add_argument("--json", help="сохранить результаты в файл")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(_main(args))
+    print(format_report(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""Микробенчмарки сервисного слоя, клавиатур и валидации.
+
+Каждая функция из services/purchasing.py, services/commands.py и
+services/reviews.py вызывается многократно против локальной MySQL;
+измеряются задержка вызова и пиковый объём выделенной памяти (tracemalloc).
+
+    MYSQL_DATABASE=land_course_bench python -m benchmarks.micro --save benchmarks/baselines/micro.json
+    python -m benchmarks.micro --compare benchmarks/baselines/micro.json --threshold 0.2
+    python -m benchmarks.micro --filter keyboards
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("MYSQL_DATABASE", "land_course_bench")
+
+from benchmarks.load import percentile, seed_database
+
+BENCH_USER_BASE = 9_100_000_000
+BENCH_USERS = 100
+# Порог роста выделений в байтах, ниже которого изменения считаются шумом
+ALLOC_NOISE_BYTES = 256
+
+# (имя, функция(i), число вызовов)
+CASES = []
+
+
+def case(name: str, iterations: int = 200):
+    def register(fn):
+        CASES.append((name, fn, iterations))
+        return fn
+    return register
+
+
+def _user(i: int) -> int:
+    return BENCH_USER_BASE + i % BENCH_USERS
+
+
+def _payment(i: int, status: str = "pending", payment_id: str = None):
+    return SimpleNamespace(
+        id=payment_id or f"micro-{_user(i)}-{i % 10}",
+        status=status,
+        amount=SimpleNamespace(value="1.00", currency="RUB"),
+        payment_method=SimpleNamespace(type="bank_card"),
+    )
+
+
+# --- services/purchasing.py ---
+
+@case("purchasing.save_or_update_users[50]", iterations=50)
+async def _(i):
+    from services.purchasing import save_or_update_users
+    now = int(time.time())
+    await save_or_update_users([(_user(i + k), f"u{k}", "Bench", None, None, now) for k in range(50)])
+
+
+@case("purchasing.save_or_update_user")
+async def _(i):
+    from services.purchasing import save_or_update_user
+    await save_or_update_user(_user(i), username=f"bench{i}", first_name="Bench")
+
+
+@case("purchasing.save_consent")
+async def _(i):
+    from services.purchasing import save_consent
+    await save_consent(_user(i), True, True)
+
+
+@case("purchasing.check_consent")
+async def _(i):
+    from services.purchasing import check_consent
+    await check_consent(_user(i))
+
+
+@case("purchasing.save_yookassa_payment")
+async def _(i):
+    from services.purchasing import save_yookassa_payment
+    # Свои id, чтобы не перезаписать засеянные успешные платежи для has_payment[db]
+    await save_yookassa_payment(_user(i), _payment(i, payment_id=f"micro-write-{i}"))
+
+
+@case("purchasing.has_payment[index]", iterations=2000)
+async def _(i):
+    from services.purchasing import has_payment
+    await has_payment(_user(i))
+
+
+@case("purchasing.has_payment[db]")
+async def _(i):
+    from services.entitlements import entitlements
+    from services.purchasing import has_payment
+    loaded, entitlements.loaded = entitlements.loaded, False
+    try:
+        await has_payment(_user(i))
+    finally:
+        entitlements.loaded = loaded
+
+
+@case("purchasing.save_invite_link")
+async def _(i):
+    from services.purchasing import save_invite_link
+    await save_invite_link(_user(i), f"https://t.me/+micro{i}")
+
+
+@case("purchasing.validate_email[valid]", iterations=5000)
+def _(i):
+    from services.purchasing import validate_email
+    validate_email("user.name@example.com")
+
+
+@case("purchasing.validate_email[invalid]", iterations=5000)
+def _(i):
+    from services.purchasing import validate_email
+    validate_email("user.name@example")
+
+
+@case("purchasing.get_user_email")
+async def _(i):
+    from services.purchasing import get_user_email
+    await get_user_email(_user(i))
+
+
+@case("purchasing.save_user_email")
+async def _(i):
+    from services.purchasing import save_user_email
+    await save_user_email(_user(i), f"bench{_user(i)}@example.com")
+
+
+@case("purchasing.get_user_invite_link")
+async def _(i):
+    from services.purchasing import get_user_invite_link
+    await get_user_invite_link(_user(i))
+
+
+# --- services/commands.py ---
+
+@case("commands.load_messages", iterations=50)
+async def _(i):
+    from services.commands import load_messages
+    await load_messages()
+
+
+@case("commands.get_all_messages")
+async def _(i):
+    from services.commands import get_all_messages
+    await get_all_messages()
+
+
+@case("commands.get_message_titles", iterations=2000)
+async def _(i):
+    from services.commands import get_message_titles
+    await get_message_titles()
+
+
+@case("commands.get_message_by_id[cached]", iterations=5000)
+async def _(i):
+    from services.commands import get_message_by_id, message_cache
+    await get_message_by_id(message_cache.get_by_title("Начать")[0])
+
+
+@case("commands.get_message_by_title[cached]", iterations=5000)
+async def _(i):
+    from services.commands import get_message_by_title
+    await get_message_by_title("Начать")
+
+
+@case("commands.get_message_by_title[miss]")
+async def _(i):
+    from services.commands import get_message_by_title
+    await get_message_by_title("Нет такого текста")
+
+
+@case("commands.get_command_message[unknown]", iterations=5000)
+async def _(i):
+    from services.commands import get_command_message
+    await get_command_message(f"asdf{i}")
+
+
+@case("commands.update_message_text", iterations=100)
+async def _(i):
+    from services.commands import message_cache, update_message_text
+    row = message_cache.get_by_title("Подробнее")
+    await update_message_text(row[0], row[2])
+
+
+@case("commands.is_admin", iterations=5000)
+def _(i):
+    from services.commands import is_admin
+    is_admin(_user(i))
+
+
+# --- services/reviews.py ---
+
+_review_service = None
+_review_ids = []
+
+
+def _reviews():
+    global _review_service
+    if _review_service is None:
+        from services.reviews import ReviewService
+        _review_service = ReviewService()
+    return _review_service
+
+
+@case("reviews.add_review", iterations=100)
+async def _(i):
+    await _reviews().add_review(f"micro_{time.time_ns()}_{i}")
+
+
+@case("reviews.get_all_reviews")
+async def _(i):
+    await _reviews().get_all_reviews()
+
+
+@case("reviews.get_album[cached]", iterations=2000)
+async def _(i):
+    await _reviews().get_album()
+
+
+@case("reviews.get_album[cold]")
+async def _(i):
+    service = _reviews()
+    service._album = None
+    await service.get_album()
+
+
+@case("reviews.get_reviews_page")
+async def _(i):
+    await _reviews().get_reviews_page()
+
+
+@case("reviews.count_reviews")
+async def _(i):
+    await _reviews().count_reviews()
+
+
+@case("reviews.get_photo_url")
+async def _(i):
+    service = _reviews()
+    reviews, _, _ = await service.get_reviews_page()
+    if reviews:
+        await service.get_photo_url(reviews[i % len(reviews)][0])
+
+
+@case("reviews.delete_review", iterations=50)
+async def _(i):
+    from services import database
+    service = _reviews()
+    await service.add_review(f"micro_del_{time.time_ns()}")
+    row = await database.fetchone("SELECT MAX(id) FROM reviews")
+    await service.delete_review(row[0])
+
+
+@case("reviews.delete_review_and_reset_ids", iterations=50)
+async def _(i):
+    from services import database
+    service = _reviews()
+    await service.add_review(f"micro_del_{time.time_ns()}")
+    row = await database.fetchone("SELECT MAX(id) FROM reviews")
+    await service.delete_review_and_reset_ids(row[0])
+
+
+# --- клавиатуры ---
+
+@case("keyboards.inline.get_start_keyboard", iterations=5000)
+def _(i):
+    from keyboards import inline
+    inline.get_start_keyboard()
+
+
+@case("keyboards.inline.get_buy_button", iterations=5000)
+def _(i):
+    from keyboards import inline
+    inline.get_buy_button()
+
+
+@case("keyboards.inline.get_support_button", iterations=5000)
+def _(i):
+    from keyboards import inline
+    inline.get_support_button()
+
+
+@case("keyboards.inline.get_press_to_buy_button", iterations=5000)
+def _(i):
+    from keyboards import inline
+    inline.get_press_to_buy_button()
+
+
+@case("keyboards.inline.get_back_button", iterations=5000)
+def _(i):
+    from keyboards import inline
+    inline.get_back_button()
+
+
+@case("keyboards.inline.add_back_button", iterations=5000)
+def _(i):
+    from keyboards import inline
+    inline.add_back_button(inline.get_buy_button())
+
+
+@case("keyboards.inline.get_reviews_keyboard", iterations=5000)
+def _(i):
+    from keyboards import inline
+    inline.get_reviews_keyboard(i or None)
+
+
+@case("keyboards.inline.get_continue_button", iterations=5000)
+def _(i):
+    from keyboards import inline
+    inline.get_continue_button()
+
+
+@case("keyboards.admin.get_admin_kb", iterations=5000)
+def _(i):
+    from keyboards import admin
+    admin.get_admin_kb()
+
+
+@case("keyboards.admin.get_back_kb", iterations=5000)
+def _(i):
+    from keyboards import admin
+    admin.get_back_kb()
+
+
+@case("handlers.callbacks.get_consent_buttons", iterations=5000)
+def _(i):
+    from handlers.callbacks import get_consent_buttons, user_consents
+    user_id = _user(i)
+    user_consents.set(user_id, {"data_consent": bool(i & 1), "offer_consent": bool(i & 2)})
+    get_consent_buttons(user_id)
+
+
+async def _call(fn, i: int):
+    result = fn(i)
+    if inspect.isawaitable(result):
+        await result
+
+
+async def run_case(fn, iterations: int) -> dict:
+    warmup = max(1, iterations // 10)
+    for i in range(warmup):
+        await _call(fn, i)
+
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        await _call(fn, i)
+        timings.append(time.perf_counter() - started)
+
+    # Отдельный проход: tracemalloc заметно замедляет вызовы
+    alloc_calls = min(iterations, 100)
+    tracemalloc.start()
+    try:
+        allocated = 0
+        for i in range(alloc_calls):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await _call(fn, i)
+            allocated += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "calls": iterations,
+        "mean_us": round(sum(timings) / len(timings) * 1e6, 2),
+        "p50_us": round(percentile(timings, 50) * 1e6, 2),
+        "p95_us": round(percentile(timings, 95) * 1e6, 2),
+        "alloc_bytes": round(allocated / alloc_calls),
+    }
+
+
+async def _setup():
+    from services import database, migrations
+    from services.entitlements import entitlements
+    from services.purchasing import save_or_update_users, save_yookassa_payment
+
+    await database.init_pool()
+    await migrations.run_migrations()
+    await seed_database()
+    now = int(time.time())
+    await save_or_update_users([
+        (BENCH_USER_BASE + k, f"bench{k}", "Bench", None, f"bench{BENCH_USER_BASE + k}@example.com", now)
+        for k in range(BENCH_USERS)
+    ])
+    # Половина пользователей — с оплатой
+    for k in range(0, BENCH_USERS, 2):
+        await save_yookassa_payment(BENCH_USER_BASE + k, _payment(k, "succeeded"))
+    await entitlements.load()
+
+
+async def _teardown():
+    from services import database
+    await database.execute("DELETE FROM reviews WHERE photo_url LIKE %s", ("micro\\_%",))
+    await database.execute("DELETE FROM payments WHERE payment_id LIKE %s", ("micro-write-%",))
+    await database.close_pool()
+
+
+async def run(name_filter: str = None) -> dict:
+    selected = [c for c in CASES if not name_filter or name_filter in c[0]]
+    db_cases = any(inspect.iscoroutinefunction(fn) for _, fn, _ in selected)
+    if db_cases:
+        await _setup()
+    try:
+        results = {}
+        for name, fn, iterations in selected:
+            results[name] = await run_case(fn, iterations)
+            print(f"{name:<48}{results[name]['p50_us']:>12} мкс{results[name]['alloc_bytes']:>10} Б")
+    finally:
+        if db_cases:
+            await _teardown()
+    return results
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Возвращает описания регрессий относительно базовой линии"""
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if base["p50_us"] and result["p50_us"] > base["p50_us"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p50 {base['p50_us']} -> {result['p50_us']} мкс "
+                f"(+{(result['p50_us'] / base['p50_us'] - 1) * 100:.0f}%)"
+            )
+        grown = result["alloc_bytes"] - base["alloc_bytes"]
+        if grown > ALLOC_NOISE_BYTES and result["alloc_bytes"] > base["alloc_bytes"] * (1 + threshold):
+            regressions.append(f"{name}: память {base['alloc_bytes']} -> {result['alloc_bytes']} Б")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="запускать только случаи, содержащие подстроку")
+    parser.add_argument("--save", help="записать результаты как базовую линию (JSON)")
+    parser.add_argument("--compare", help="сравнить с базовой линией (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимый рост, доля (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.filter))
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created_at": int(time.time()),
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"Базовая линия сохранена: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"РЕГРЕССИЯ {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"Регрессий нет (порог {args.threshold * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
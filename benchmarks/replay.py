@@ -0,0 +1,131 @@
+"""Воспроизведение записанного трафика (UPDATE_RECORDER_ENABLED) через Dispatcher.
+
+Обновления подаются с исходными интервалами, ускоренными в --speed раз
+(--speed 0 — без пауз), против тех же заглушек и базы, что и benchmarks.load.
+
+    MYSQL_DATABASE=land_course_bench python -m benchmarks.replay recordings/updates.jsonl --speed 10
+    python -m benchmarks.replay recordings/updates.jsonl --speed 1 --json release.json
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+from benchmarks.load import bot_harness, percentile
+
+_EVENT_TYPES = ("message", "callback_query", "chat_join_request", "chat_member", "edited_message")
+
+
+def load_log(path: str, limit: int = 0) -> list[tuple[float, dict]]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            records.append((record["t"], record["update"]))
+            if limit and len(records) >= limit:
+                break
+    records.sort(key=lambda record: record[0])
+    return records
+
+
+def _event_type(update: dict) -> str:
+    return next((name for name in _EVENT_TYPES if name in update), "other")
+
+
+async def replay(records: list[tuple[float, dict]], speed: float) -> dict:
+    import main
+    from aiogram.types import Update
+
+    latencies = defaultdict(list)
+    lags = []
+    errors = 0
+    first_t = records[0][0]
+
+    async def feed(update: Update, kind: str, scheduled: float):
+        nonlocal errors
+        started = time.perf_counter()
+        lags.append(started - scheduled)
+        try:
+            await main.dp.feed_update(main.bot, update)
+        except Exception:
+            errors += 1
+        latencies[kind].append(time.perf_counter() - started)
+
+    tasks = []
+    started = time.perf_counter()
+    for t, raw in records:
+        scheduled = started + ((t - first_t) / speed if speed else 0)
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # update_id в логе может повторяться между запусками — aiogram это не проверяет
+        update = Update.model_validate(raw, context={"bot": main.bot})
+        tasks.append(asyncio.create_task(feed(update, _event_type(raw), scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "updates": len(all_latencies),
+        "errors": errors,
+        "speed": speed,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_ups": round(len(all_latencies) / elapsed, 1) if elapsed else 0.0,
+        "schedule_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+        "latency_ms": {
+            kind: {
+                "count": len(values),
+                "p50": round(percentile(values, 50) * 1000, 2),
+                "p95": round(percentile(values, 95) * 1000, 2),
+                "p99": round(percentile(values, 99) * 1000, 2),
+                "max": round(max(values) * 1000, 2),
+            }
+            for kind, values in sorted(latencies.items()) + [("all", all_latencies)]
+        },
+    }
+
+
+def format_report(result: dict) -> str:
+    lines = [
+        f"Обновлений: {result['updates']}, ошибок: {result['errors']}, "
+        f"скорость x{result['speed'] or '∞'}, {result['elapsed_s']} сек "
+        f"({result['throughput_ups']} upd/s), отставание p99 {result['schedule_lag_p99_ms']} мс",
+        f"{'тип':<20}{'кол-во':>8}{'p50 мс':>9}{'p95 мс':>9}{'p99 мс':>9}{'max мс':>9}",
+    ]
+    for kind, stats in result["latency_ms"].items():
+        lines.append(
+            f"{kind:<20}{stats['count']:>8}{stats['p50']:>9}{stats['p95']:>9}{stats['p99']:>9}{stats['max']:>9}"
+        )
+    return "\n".join(lines)
+
+
+async def _main(args) -> dict:
+    records = load_log(args.log, args.limit)
+    if not records:
+        raise SystemExit("Лог пуст")
+    async with bot_harness(args.api_latency):
+        return await replay(records, args.speed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="JSONL-лог обновлений")
+    parser.add_argument("--speed", type=float, default=1.0, help="ускорение относительно записи, 0 — без пауз")
+    parser.add_argument("--limit", type=int, default=0, help="воспроизвести только первые N обновлений")
+    parser.add_argument("--api-latency", type=float, default=0.0,
+                        help="искусственная задержка заглушек Bot API и ЮKassa, сек")
+    parser.add_argument("--json", help="сохранить результаты в файл")
+    args = parser.parse_args()
+
+    result = asyncio.run(_main(args))
+    print(format_report(result))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
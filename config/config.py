@@ -16,4 +16,98 @@ MYSQL_CONFIG = {
     'password': os.getenv("MYSQL_PASSWORD", ""),
     'database': os.getenv("MYSQL_DATABASE", "land_course"),
     'autocommit': True
-}
\ No newline at end of file
+}
+# Пул соединений MySQL
+MYSQL_POOL_MIN_SIZE = int(os.getenv("MYSQL_POOL_MIN_SIZE", 2))
+MYSQL_POOL_MAX_SIZE = int(os.getenv("MYSQL_POOL_MAX_SIZE", 10))
+MYSQL_POOL_ACQUIRE_TIMEOUT = float(os.getenv("MYSQL_POOL_ACQUIRE_TIMEOUT", 5))
+MYSQL_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("MYSQL_POOL_HEALTH_CHECK_INTERVAL", 30))
+
+# ID приватного канала с курсом
+CHANNEL_ID = os.getenv("CHANNEL_ID", "-1002597950609")
+
+# HTTP-сервер (FastAPI) для вебхуков
+WEB_SERVER_ENABLED = os.getenv("WEB_SERVER_ENABLED", "1").lower() in ("1", "true", "yes")
+WEB_SERVER_HOST = os.getenv("WEB_SERVER_HOST", "0.0.0.0")
+WEB_SERVER_PORT = int(os.getenv("WEB_SERVER_PORT", 8000))
+YOOKASSA_WEBHOOK_PATH = os.getenv("YOOKASSA_WEBHOOK_PATH", "/yookassa/webhook")
+YOOKASSA_WEBHOOK_CHECK_IP = os.getenv("YOOKASSA_WEBHOOK_CHECK_IP", "1").lower() in ("1", "true", "yes")
+
+# Фоновая проверка статусов платежей
+PAYMENT_CHECK_DELAYS = [int(x) for x in os.getenv("PAYMENT_CHECK_DELAYS", "5,5,10,10,20,30,60").split(",") if x]
+PAYMENT_CHECK_TIMEOUT = int(os.getenv("PAYMENT_CHECK_TIMEOUT", 900))
+PAYMENT_CHECK_BATCH_SIZE = int(os.getenv("PAYMENT_CHECK_BATCH_SIZE", 50))
+PAYMENT_CHECK_CONCURRENCY = int(os.getenv("PAYMENT_CHECK_CONCURRENCY", 5))
+
+# HTTP-клиент ЮKassa
+YOOKASSA_API_URL = os.getenv("YOOKASSA_API_URL", "https://api.yookassa.ru/v3")
+YOOKASSA_TIMEOUT = float(os.getenv("YOOKASSA_TIMEOUT", 10))
+YOOKASSA_POOL_SIZE = int(os.getenv("YOOKASSA_POOL_SIZE", 10))
+
+# Режим получения обновлений Telegram: polling или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", NGROK_TUNEL_URL)
+TELEGRAM_WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")
+# Альтернативный адрес Bot API (локальный сервер или заглушка для тестов)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
+
+# Интервал сверки индекса оплативших пользователей с таблицей payments (сек)
+ENTITLEMENT_RECONCILE_INTERVAL = int(os.getenv("ENTITLEMENT_RECONCILE_INTERVAL", 300))
+
+# Состояние согласий в процессе покупки
+CONSENT_STATE_TTL = int(os.getenv("CONSENT_STATE_TTL", 3600))
+CONSENT_STATE_MAX_SIZE = int(os.getenv("CONSENT_STATE_MAX_SIZE", 10000))
+
+# Отложенная пакетная запись регистраций (/start)
+REGISTRATION_FLUSH_INTERVAL = float(os.getenv("REGISTRATION_FLUSH_INTERVAL", 0.3))
+REGISTRATION_BATCH_SIZE = int(os.getenv("REGISTRATION_BATCH_SIZE", 200))
+
+# Ограничение исходящих сообщений Telegram
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", 30))
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", 1))
+OUTBOUND_CHAT_BURST = int(os.getenv("OUTBOUND_CHAT_BURST", 3))
+OUTBOUND_GROUP_RATE = float(os.getenv("OUTBOUND_GROUP_RATE", 20 / 60))
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", 3))
+
+# Рассылки
+BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", 500))
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", 25))
+BROADCAST_PROGRESS_INTERVAL = float(os.getenv("BROADCAST_PROGRESS_INTERVAL", 5))
+
+# Пул заранее созданных ссылок-приглашений в канал
+INVITE_POOL_SIZE = int(os.getenv("INVITE_POOL_SIZE", 20))
+INVITE_LINK_TTL = int(os.getenv("INVITE_LINK_TTL", 7 * 24 * 3600))
+INVITE_LINK_MIN_TTL = int(os.getenv("INVITE_LINK_MIN_TTL", 24 * 3600))
+INVITE_POOL_REFILL_INTERVAL = int(os.getenv("INVITE_POOL_REFILL_INTERVAL", 300))
+
+# Кэш членства пользователей в канале
+MEMBERSHIP_CACHE_TTL = int(os.getenv("MEMBERSHIP_CACHE_TTL", 600))
+MEMBERSHIP_CACHE_MAX_SIZE = int(os.getenv("MEMBERSHIP_CACHE_MAX_SIZE", 10000))
+
+# Метрики Prometheus — на отдельном внутреннем порту, не на публичном порту вебхуков
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9100))
+
+# Проверка планов горячих запросов при запуске; таблицы с меньшей оценкой строк не проверяются
+PLAN_CHECK_ON_STARTUP = os.getenv("PLAN_CHECK_ON_STARTUP", "1").lower() in ("1", "true", "yes")
+PLAN_CHECK_MIN_ROWS = int(os.getenv("PLAN_CHECK_MIN_ROWS", 1000))
+
+# Сторож блокировок цикла событий (по умолчанию выключен)
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "0").lower() in ("1", "true", "yes")
+LOOP_WATCHDOG_THRESHOLD = float(os.getenv("LOOP_WATCHDOG_THRESHOLD", 0.1))
+LOOP_WATCHDOG_INTERVAL = float(os.getenv("LOOP_WATCHDOG_INTERVAL", 0.02))
+
+# Запись входящих обновлений для воспроизведения в бенчмарках (по умолчанию выключена)
+UPDATE_RECORDER_ENABLED = os.getenv("UPDATE_RECORDER_ENABLED", "0").lower() in ("1", "true", "yes")
+UPDATE_RECORDER_PATH = os.getenv("UPDATE_RECORDER_PATH", "recordings/updates.jsonl")
+UPDATE_RECORDER_SALT = os.getenv("UPDATE_RECORDER_SALT", "")
+UPDATE_RECORDER_FLUSH_INTERVAL = float(os.getenv("UPDATE_RECORDER_FLUSH_INTERVAL", 1))
+
+# Негативный кэш неизвестных /команд (пока таблица команд не загружена)
+COMMAND_NEGATIVE_CACHE_SIZE = int(os.getenv("COMMAND_NEGATIVE_CACHE_SIZE", 10000))
+COMMAND_NEGATIVE_CACHE_TTL = int(os.getenv("COMMAND_NEGATIVE_CACHE_TTL", 300))
+
+# Стоимость курса (руб.) — используется при создании и проверке платежей
+COURSE_PRICE = os.getenv("COURSE_PRICE", "1.00")
@@ -0,0 +1,197 @@
+"""Локальные заглушки Telegram для тестирования режима webhook.
+
+    # заглушка Bot API (TELEGRAM_API_URL=http://127.0.0.1:8081)
+    python -m devtools.fake_telegram serve --port 8081
+
+    # отправка синтетических обновлений в вебхук бота
+    python -m devtools.fake_telegram send --url http://127.0.0.1:8000/telegram/webhook --users 100
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+_update_ids = itertools.count(1)
+_message_ids = itertools.count(1000)
+
+
+def _user(user_id: int) -> dict:
+    return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "username": f"user{user_id}"}
+
+
+def _chat(chat_id: int) -> dict:
+    return {"id": chat_id, "type": "private", "first_name": f"User{chat_id}"}
+
+
+def make_message_update(user_id: int, text: str) -> dict:
+    message = {
+        "message_id": next(_message_ids),
+        "date": int(time.time()),
+        "chat": _chat(user_id),
+        "from": _user(user_id),
+        "text": text,
+    }
+    if text.startswith("/"):
+        command = text.split()[0]
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(command)}]
+    return {"update_id": next(_update_ids), "message": message}
+
+
+def make_callback_update(user_id: int, data: str) -> dict:
+    return {
+        "update_id": next(_update_ids),
+        "callback_query": {
+            "id": str(next(_update_ids)),
+            "from": _user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": next(_message_ids),
+                "date": int(time.time()),
+                "chat": _chat(user_id),
+                "from": {"id": 1, "is_bot": True, "first_name": "Bot"},
+                "text": "menu",
+            },
+        },
+    }
+
+
+def make_join_request_update(user_id: int, channel_id: int) -> dict:
+    return {
+        "update_id": next(_update_ids),
+        "chat_join_request": {
+            "chat": {"id": channel_id, "type": "channel", "title": "Course"},
+            "from": _user(user_id),
+            "user_chat_id": user_id,
+            "date": int(time.time()),
+        },
+    }
+
+
+class FakeBotAPI:
+    """Заглушка Bot API: отвечает правдоподобными результатами на любые методы"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self._handle)
+
+    def _message(self, params: dict) -> dict:
+        chat_id = int(params.get("chat_id") or 0)
+        return {
+            "message_id": next(_message_ids),
+            "date": int(time.time()),
+            "chat": _chat(chat_id),
+            "from": {"id": 1, "is_bot": True, "first_name": "Bot"},
+            "text": params.get("text", ""),
+        }
+
+    def _result(self, method: str, params: dict):
+        method = method.lower()
+        if method == "getme":
+            return {"id": 1, "is_bot": True, "first_name": "Bot", "username": "fake_bot"}
+        if method in ("sendmessage", "sendphoto", "editmessagetext", "editmessagecaption",
+                      "editmessagereplymarkup"):
+            return self._message(params)
+        if method == "sendmediagroup":
+            media = json.loads(params.get("media", "[]"))
+            return [self._message(params) for _ in media]
+        if method == "createchatinvitelink":
+            return {
+                "invite_link": f"https://t.me/+fake{next(_message_ids)}",
+                "creator": {"id": 1, "is_bot": True, "first_name": "Bot"},
+                "creates_join_request": False,
+                "is_primary": False,
+                "is_revoked": False,
+                "member_limit": 1,
+            }
+        if method == "getchatmember":
+            return {"status": "left", "user": _user(int(params.get("user_id") or 0))}
+        if method == "getchatmembercount":
+            return 0
+        return True
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response({"ok": True, "result": self._result(method, params)})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8081) -> web.AppRunner:
+        runner = web.AppRunner(self.app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+async def send_updates(url: str, updates: list[dict], concurrency: int = 10,
+                       secret: str = None) -> list[float]:
+    """Отправляет обновления в вебхук и возвращает задержки ответов (сек)"""
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with aiohttp.ClientSession(headers=headers) as session:
+        async def post(update: dict):
+            async with semaphore:
+                started = time.perf_counter()
+                async with session.post(url, json=update) as response:
+                    await response.read()
+                    response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(post(update) for update in updates))
+    return latencies
+
+
+async def _serve(args):
+    api = FakeBotAPI(latency=args.latency)
+    runner = await api.start(args.host, args.port)
+    print(f"Заглушка Bot API: http://{args.host}:{args.port}")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await runner.cleanup()
+
+
+async def _send(args):
+    updates = [make_message_update(10_000 + i, args.text) for i in range(args.users)]
+    started = time.perf_counter()
+    latencies = sorted(await send_updates(args.url, updates, args.concurrency, args.secret))
+    elapsed = time.perf_counter() - started
+    print(f"Отправлено: {len(latencies)} за {elapsed:.2f} сек ({len(latencies) / elapsed:.1f} upd/s)")
+    print(f"p50={latencies[len(latencies) // 2] * 1000:.1f} мс, "
+          f"max={latencies[-1] * 1000:.1f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="запустить заглушку Bot API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8081)
+    serve.add_argument("--latency", type=float, default=0.0, help="искусственная задержка ответа, сек")
+
+    send = sub.add_parser("send", help="отправить обновления в вебхук")
+    send.add_argument("--url", required=True)
+    send.add_argument("--users", type=int, default=100)
+    send.add_argument("--text", default="/start")
+    send.add_argument("--concurrency", type=int, default=10)
+    send.add_argument("--secret")
+
+    args = parser.parse_args()
+    asyncio.run(_serve(args) if args.command == "serve" else _send(args))
+
+
+if __name__ == "__main__":
+    main()
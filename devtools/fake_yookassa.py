@@ -0,0 +1,93 @@
+"""Локальная заглушка API ЮKassa (YOOKASSA_API_URL=http://127.0.0.1:8082/v3).
+
+    python -m devtools.fake_yookassa --port 8082
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+
+from aiohttp import web
+
+
+class FakeYooKassaAPI:
+    """Создаёт платежи в статусе pending; при проверке статуса они уже succeeded"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = Counter()
+        self.payments = {}
+        self.app = web.Application()
+        self.app.router.add_post("/v3/payments", self._create)
+        self.app.router.add_get("/v3/payments/{payment_id}", self._find)
+
+    async def _create(self, request: web.Request) -> web.Response:
+        params = await request.json()
+        self.calls["create_payment"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        payment_id = str(uuid.uuid4())
+        payment = {
+            "id": payment_id,
+            "status": "pending",
+            "paid": False,
+            "amount": params["amount"],
+            "confirmation": {
+                "type": "redirect",
+                "confirmation_url": f"https://yoomoney.ru/checkout/payments/v2/contract?orderId={payment_id}",
+            },
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+            "description": params.get("description"),
+            "metadata": params.get("metadata", {}),
+            "recipient": {"account_id": "0", "gateway_id": "0"},
+            "refundable": False,
+            "test": True,
+        }
+        self.payments[payment_id] = payment
+        return web.json_response(payment)
+
+    async def _find(self, request: web.Request) -> web.Response:
+        payment_id = request.match_info["payment_id"]
+        self.calls["find_payment"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        payment = self.payments.get(payment_id)
+        if payment is None:
+            return web.json_response({"type": "error", "code": "not_found"}, status=404)
+        payment.update(
+            status="succeeded",
+            paid=True,
+            payment_method={"type": "bank_card", "id": payment_id, "saved": False},
+        )
+        return web.json_response(payment)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8082) -> web.AppRunner:
+        runner = web.AppRunner(self.app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+async def _serve(args):
+    api = FakeYooKassaAPI(latency=args.latency)
+    runner = await api.start(args.host, args.port)
+    print(f"Заглушка ЮKassa: http://{args.host}:{args.port}/v3")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", type=float, default=0.0, help="искусственная задержка ответа, сек")
+    args = parser.parse_args()
+    asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from aiogram.utils.media_group import MediaGroupBuilder
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import Message, CallbackQuery
@@ -10,15 +9,23 @@ from aiogram.filters import Command
 from middlewares.admin import AdminPhotoMiddleware
 from services.reviews import ReviewService
 from services.session import admin_session
-from keyboards.admin import get_admin_kb, get_back_kb
+from keyboards.admin import get_admin_kb, get_back_kb, get_delete_reviews_kb, get_broadcast_confirm_kb
+from services.broadcast import broadcast_engine
 
 import logging
 import asyncio
 from config import config
 
+# Отзывов на одной странице меню удаления
+REVIEWS_PAGE_SIZE = 30
+
 class AdminStates(StatesGroup):
     waiting_for_new_text = State()
 
+class BroadcastStates(StatesGroup):
+    waiting_for_text = State()
+    waiting_for_confirm = State()
+
 logger = logging.getLogger(__name__)
 admin_router = Router()
 admin_router.message.middleware(AdminPhotoMiddleware())
@@ -88,17 +95,13 @@ async def show_all_reviews(callback: CallbackQuery, review_service: ReviewServic
     """Показать все отзывы"""
     try:
         await callback.answer()
-        reviews = await review_service.get_all_reviews()
+        album, _ = await review_service.get_album()
         
-        if not reviews:
+        if not album:
             await callback.message.answer("📭 Нет сохраненных отзывов")
             return
 
-        media_group = MediaGroupBuilder()
-        for photo_url in reviews[:10]:
-            media_group.add_photo(media=photo_url)
-        
-        await callback.message.answer_media_group(media=media_group.build())
+        await callback.message.answer_media_group(media=album)
             
     except Exception as e:
         await callback.message.answer("⚠️ Ошибка при загрузке отзывов")
@@ -149,7 +152,7 @@ async def back_to_delete_menu(callback: CallbackQuery, review_service: ReviewSer
     """Возврат в меню удаления"""
     user_id = callback.from_user.id
     try:         
-        reviews = await review_service.get_reviews_for_deletion()
+        reviews, has_older, has_newer = await review_service.get_reviews_page(limit=REVIEWS_PAGE_SIZE)
         
         if not reviews:
             await callback.message.answer(
@@ -158,18 +161,9 @@ async def back_to_delete_menu(callback: CallbackQuery, review_service: ReviewSer
             )
             return
 
-        builder = InlineKeyboardBuilder()
-        for review_id, _ in reviews:
-            builder.button(
-                text=f"❌ {review_id}",
-                callback_data=f"del_preview_{review_id}"
-            )
-        builder.button(text="🔙 В админку", callback_data="admin_back")
-        builder.adjust(3, repeat=True)
-        
         await callback.message.answer(
             "Выберите отзыв для удаления:",
-            reply_markup=builder.as_markup()
+            reply_markup=get_delete_reviews_kb(reviews, has_older, has_newer)
         )
         
     except Exception as e:
@@ -181,6 +175,27 @@ async def back_to_delete_menu(callback: CallbackQuery, review_service: ReviewSer
     finally:
         await callback.answer()
 
+@admin_router.callback_query(F.data.startswith("admin_del_older_") | F.data.startswith("admin_del_newer_"))
+async def paginate_delete_menu(callback: CallbackQuery, review_service: ReviewService):
+    """Листание списка отзывов в меню удаления"""
+    try:
+        _, _, direction, cursor = callback.data.split("_")
+        reviews, has_older, has_newer = await review_service.get_reviews_page(
+            int(cursor), newer=direction == "newer", limit=REVIEWS_PAGE_SIZE
+        )
+
+        if not reviews:
+            await callback.answer("Больше отзывов нет")
+            return
+
+        await callback.message.edit_reply_markup(
+            reply_markup=get_delete_reviews_kb(reviews, has_older, has_newer)
+        )
+        await callback.answer()
+    except Exception as e:
+        logger.error(f"Pagination error: {e}")
+        await callback.answer("⚠️ Ошибка загрузки страницы")
+
 @admin_router.callback_query(F.data.startswith("del_confirm_"))
 async def confirm_review_deletion(callback: CallbackQuery, review_service: ReviewService):
     """Удаление с перенумерацией"""
@@ -190,9 +205,7 @@ async def confirm_review_deletion(callback: CallbackQuery, review_service: Revie
         if await review_service.delete_review_and_reset_ids(review_id):
             await callback.message.delete()
             
-            # Получаем актуальный список для отображения
-            reviews = await review_service.get_reviews_for_deletion()
-            count = len(reviews)
+            count = await review_service.count_reviews()
             
             await callback.message.answer(
                 f"✅ Отзыв удален. Всего отзывов: {count}\n"
@@ -231,6 +244,63 @@ async def back_to_admin_panel(callback: CallbackQuery):
     finally:
         await callback.answer()
 
+@admin_router.callback_query(F.data == "admin_broadcast")
+async def start_broadcast(callback: CallbackQuery, state: FSMContext):
+    """Запрос текста рассылки"""
+    if callback.from_user.id not in config.ADMIN_IDS:
+        await callback.answer("⛔ Вы не являетесь админом!", show_alert=True)
+        return
+    if broadcast_engine.is_running():
+        await callback.answer("⏳ Рассылка уже идёт", show_alert=True)
+        return
+
+    await state.set_state(BroadcastStates.waiting_for_text)
+    await callback.message.answer(
+        "📣 Отправьте текст рассылки одним сообщением\n"
+        "Его получат все пользователи бота",
+        reply_markup=get_back_kb()
+    )
+    await callback.answer()
+
+@admin_router.message(BroadcastStates.waiting_for_text, F.text)
+async def broadcast_text_received(message: Message, state: FSMContext):
+    """Предпросмотр текста рассылки"""
+    if message.from_user.id not in config.ADMIN_IDS:
+        await state.clear()
+        return
+
+    await state.update_data(broadcast_text=message.text)
+    await state.set_state(BroadcastStates.waiting_for_confirm)
+    await message.answer(message.text)
+    await message.answer("Отправить это сообщение всем пользователям?",
+                         reply_markup=get_broadcast_confirm_kb())
+
+@admin_router.callback_query(F.data == "admin_broadcast_confirm", BroadcastStates.waiting_for_confirm)
+async def confirm_broadcast(callback: CallbackQuery, state: FSMContext, bot: Bot):
+    """Запуск рассылки"""
+    if callback.from_user.id not in config.ADMIN_IDS:
+        await callback.answer("⛔ Вы не являетесь админом!", show_alert=True)
+        return
+
+    data = await state.get_data()
+    await state.clear()
+    try:
+        broadcast_id = await broadcast_engine.create(callback.from_user.id, data["broadcast_text"])
+        broadcast_engine.start(bot, broadcast_id)
+        await callback.message.edit_text(f"🚀 Рассылка #{broadcast_id} запущена")
+    except Exception as e:
+        logger.error(f"Broadcast error: {e}")
+        await callback.message.answer("⚠️ Не удалось запустить рассылку",
+                                      reply_markup=get_admin_kb())
+    finally:
+        await callback.answer()
+
+@admin_router.callback_query(F.data == "admin_broadcast_cancel")
+async def cancel_broadcast(callback: CallbackQuery, state: FSMContext):
+    await state.clear()
+    await callback.message.edit_text("🔐 Админ-панель:", reply_markup=get_admin_kb())
+    await callback.answer()
+
 @admin_router.callback_query(F.data == "admin_exit")
 async def exit_admin_panel(callback: CallbackQuery):
     """Полный выход с деактивацией прав"""
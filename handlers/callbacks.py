@@ -1,51 +1,38 @@
 from aiogram import Router, F, Bot, types
-from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
-from aiogram.utils.media_group import MediaGroupBuilder
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, Message
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.context import FSMContext
 from keyboards import inline
 from services.reviews import ReviewService
-from services.purchasing import (save_consent, save_invite_link, get_user_invite_link, save_yookassa_payment, has_payment,
+from services.purchasing import (save_consent, get_user_invite_link, has_payment,
                                  check_consent, get_user_email, save_user_email, validate_email)
-from services.commands import get_all_messages, is_admin, get_message_by_title
+from services.commands import get_message_by_id, is_admin, get_message_by_title
+from services.access import send_invite_link, confirm_payment, issue_invite_link
+from services.outbound import Priority, outbound_priority
+from services.payment_checks import payment_scheduler
+from services.yookassa_client import yookassa_client
+from services.ttl_cache import TTLCache
+from services.membership import membership_cache
 from config import config
 import uuid
-from yookassa import Payment, Configuration
-import yookassa
 
 from aiogram.filters import Command
-import time
 import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 cb_handler = Router()
-review_service = ReviewService()
-
-Configuration.account_id = config.ACCOUNT_ID
-Configuration.secret_key = config.PAYMENTS_TOKEN
 
 class PurchaseStates(StatesGroup):
     awaiting_consent = State()
     awaiting_email = State()
 
-user_consents = {}
+# Согласия пользователей, ещё не завершивших покупку
+user_consents = TTLCache(max_size=config.CONSENT_STATE_MAX_SIZE, ttl=config.CONSENT_STATE_TTL)
 def get_consent_buttons(user_id: int):
-    data_text = "✓ Согласен с обработкой данных" if user_consents.get(user_id, {}).get("data_consent", False) else "Согласен с обработкой данных"
-    offer_text = "✓ Акцептую оферту" if user_consents.get(user_id, {}).get("offer_consent", False) else "Акцептую оферту"
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [
-            InlineKeyboardButton(text='Политика конфиденциальности', url='https://docs.google.com/document/d/1_01AHDErOBo8EiK_ugseiOJQ_OuxK00C/edit?tab=t.0'),
-            InlineKeyboardButton(text='Оферта', url='https://docs.google.com/document/d/1hdaA1hLhKb2vc234-WTVu-33h1viylU-/edit?tab=t.0'),
-        ],
-        [
-            InlineKeyboardButton(text=data_text, callback_data="consent_data"),
-            InlineKeyboardButton(text=offer_text, callback_data="consent_offer"),
-        ],
-        [InlineKeyboardButton(text="Продолжить", callback_data="proceed_to_payment")]
-    ])
-    return keyboard
+    consents = user_consents.get(user_id) or {}
+    return inline.get_consent_keyboard(consents.get("data_consent", False), consents.get("offer_consent", False))
 
 def get_russian_status(status: str) -> str:
     status_map = {
@@ -65,12 +52,12 @@ async def check_payment(callback: CallbackQuery, state: FSMContext, bot: Bot):
     data = await state.get_data()
     user_id = callback.from_user.id
     # Сначала проверяем БД
-    if has_payment(user_id):
-        invite_link = get_user_invite_link(user_id)
+    if await has_payment(user_id):
+        invite_link = await get_user_invite_link(user_id)
         # Проверяем, что ссылка валидная
         if not invite_link or not isinstance(invite_link, str) or not invite_link.startswith("http"):
             # Если ссылка невалидна, генерируем новую
-            await send_invite_link(callback.message, user_id, bot)
+            await send_invite_link(bot, callback.message.chat.id, user_id)
             return
 
         keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -89,15 +76,13 @@ async def check_payment(callback: CallbackQuery, state: FSMContext, bot: Bot):
         return
 
     try:
-        payment = Payment.find_one(payment_id)
+        payment = await yookassa_client.find_payment(payment_id)
         status = get_russian_status(payment.status)
 
         if payment.status == 'succeeded':
-            if not has_payment(user_id):
-                save_yookassa_payment(user_id, payment)
-
-            # Отправляем инвайт-ссылку
-            await send_invite_link(callback.message, user_id, bot)
+            # Если доступ по платежу уже выдан (вебхук/автопроверка) — просто повторяем ссылку
+            if not await confirm_payment(bot, user_id, payment):
+                await send_invite_link(bot, callback.message.chat.id, user_id)
         else:
             await callback.message.answer(f'⌛ Платеж {status}. Пожалуйста, подождите...')
 
@@ -105,49 +90,12 @@ async def check_payment(callback: CallbackQuery, state: FSMContext, bot: Bot):
         await callback.message.answer(f'⚠️ Ошибка: {str(e)}')
 
 
-async def send_invite_link(message: Message, user_id: int, bot: Bot):
-    """Функция для отправки инвайт-ссылки"""
-    chat_id = "-1002597950609"  # ID приватного канала
-
-    try:
-        # Генерация одноразовой инвайт-ссылки
-        invite_link = await bot.create_chat_invite_link(
-            chat_id=chat_id,
-            name=f"Invite for user {user_id}",
-            expire_date=int(time.time()) + 24 * 3600,  # 24 часа
-            member_limit=1  # Одноразовая ссылка
-        )
-
-        # Сохранение ссылки в базе данных
-        save_invite_link(user_id, invite_link.invite_link)
-
-        # Создание клавиатуры с кнопкой
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="Перейти в канал", url=invite_link.invite_link)]
-        ])
-
-        # Отправка сообщения
-        await message.answer(
-            """
-Ваш доступ к материалам курса находится в закрытом Telegram-канале. 
-
-**Важно**: 
-- Она одноразовая и предназначена только для вас
-- Не передавайте её другим!""",
-            reply_markup=keyboard,
-            parse_mode="Markdown"
-        )
-
-    except Exception as e:
-        await message.answer("❌ Произошла ошибка при создании доступа. Обратитесь в поддержку.")
-        print(f"Error creating invite link: {e}")
-
 async def create_yookassa_payment(user_id: int, email: str):
     try:
         idempotence_key = str(uuid.uuid4())
-        amount = 1.00
+        amount = float(config.COURSE_PRICE)
         
-        payment = Payment.create({
+        payment = await yookassa_client.create_payment({
             "amount": {
                 "value": f"{amount:.2f}",
                 "currency": "RUB"
@@ -204,7 +152,7 @@ async def process_payment(user_id: int, email: str, message: Message, state: FSM
             reply_markup=pay_button
         )
         
-        asyncio.create_task(auto_check_payment(payment_id, user_id, message, bot))
+        await payment_scheduler.add(payment_id, user_id, message.chat.id)
     else:
         await message.answer("Ошибка при создании платежа. Пожалуйста, проверьте логи.")
 
@@ -217,7 +165,7 @@ async def process_email(message: Message, state: FSMContext, bot: Bot):
         await message.answer("❌ Некорректный email. Пожалуйста, введите правильный email адрес.")
         return
 
-    save_user_email(user_id, email)
+    await save_user_email(user_id, email)
     
     state_data = await state.get_data()
     callback_message = state_data.get('callback_message')
@@ -233,16 +181,15 @@ async def handler_buy(callback: CallbackQuery, bot: Bot, state: FSMContext):
     user_id = callback.from_user.id
     await callback.answer()
 
-    if has_payment(user_id):
-        chat_id = "-1002597950609"
-        invite_link = get_user_invite_link(user_id)
+    if await has_payment(user_id):
+        chat_id = config.CHANNEL_ID
+        invite_link = await get_user_invite_link(user_id)
 
         if not invite_link:
-            await send_invite_link(callback.message, user_id, bot)
+            await send_invite_link(bot, callback.message.chat.id, user_id)
             return
         try:
-            member = await bot.get_chat_member(chat_id, user_id)
-            if member.status in ["member", "administrator", "creator"]:
+            if await membership_cache.is_member(bot, user_id):
                 keyboard = InlineKeyboardMarkup(inline_keyboard=[
                     [InlineKeyboardButton(text="Перейти в канал", url=f"https://t.me/c/{chat_id[4:]}/1")],
                     [InlineKeyboardButton(text="Назад", callback_data="back_to_menu")],
@@ -277,18 +224,18 @@ async def handler_buy(callback: CallbackQuery, bot: Bot, state: FSMContext):
             )
             return
 
-    data_consent, offer_consent = check_consent(user_id)
+    data_consent, offer_consent = await check_consent(user_id)
     if not (data_consent and offer_consent):
-        msg_data = get_message_by_title("Согласие на обработку данных")
+        msg_data = await get_message_by_title("Согласие на обработку данных")
         msg_text = msg_data[2]
-        user_consents[user_id] = {"data_consent": False, "offer_consent": False}
+        user_consents.set(user_id, {"data_consent": False, "offer_consent": False})
         await callback.message.answer(
             msg_text,
             reply_markup=get_consent_buttons(user_id),
         )
         await state.set_state(PurchaseStates.awaiting_consent)
     else:
-        email = get_user_email(user_id)
+        email = await get_user_email(user_id)
         if not email:
             await callback.message.answer(
                 "📧 Для продолжения покупки и получения чека, пожалуйста, укажите ваш email:"
@@ -306,10 +253,9 @@ async def consent_data(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Процесс покупки уже завершён или не начат. Нажмите 'Купить' для повторного прохождения.", show_alert=True)
         return
     
-    if user_id not in user_consents:
-        user_consents[user_id] = {"data_consent": False, "offer_consent": False}
-    
-    user_consents[user_id]["data_consent"] = True
+    consents = user_consents.get(user_id) or {"data_consent": False, "offer_consent": False}
+    consents["data_consent"] = True
+    user_consents.set(user_id, consents)
     await callback.answer("Согласие на обработку персональных данных подтверждено!")
     await callback.message.edit_reply_markup(reply_markup=get_consent_buttons(user_id))
 
@@ -322,10 +268,9 @@ async def consent_offer(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Процесс покупки уже завершён или не начат. Нажмите 'Купить' для повторного прохождения.", show_alert=True)
         return
     
-    if user_id not in user_consents:
-        user_consents[user_id] = {"data_consent": False, "offer_consent": False}
-    
-    user_consents[user_id]["offer_consent"] = True
+    consents = user_consents.get(user_id) or {"data_consent": False, "offer_consent": False}
+    consents["offer_consent"] = True
+    user_consents.set(user_id, consents)
     await callback.answer("Оферта акцептована!")
     await callback.message.edit_reply_markup(reply_markup=get_consent_buttons(user_id))
 
@@ -339,14 +284,15 @@ async def proceed_to_payment(callback: CallbackQuery, state: FSMContext, bot: Bo
         await callback.answer("Процесс покупки уже завершён или не начат. Нажмите 'Купить' для повторного прохождения.", show_alert=True)
         return
 
-    consents = user_consents.get(user_id, {})
+    consents = user_consents.get(user_id) or {}
     if not (consents.get("data_consent") and consents.get("offer_consent")):
         await callback.answer("Необходимо подтвердить оба согласия", show_alert=True)
         return
     
-    save_consent(user_id, True, True)
+    await save_consent(user_id, True, True)
+    user_consents.pop(user_id)
     
-    email = get_user_email(user_id)
+    email = await get_user_email(user_id)
     if not email:
         await callback.message.answer(
             "📧 Для продолжения покупки и получения чека, пожалуйста, укажите ваш email:"
@@ -357,31 +303,9 @@ async def proceed_to_payment(callback: CallbackQuery, state: FSMContext, bot: Bo
     
     await process_payment(user_id, email, callback.message, state, bot)
 
-async def auto_check_payment(payment_id: str, user_id: int, message: Message, bot: Bot):
-    """Автоматическая проверка статуса платежа"""
-    max_attempts = 30  # ~5 минут при delay=10 сек
-    delay = 10
-    for attempt in range(max_attempts):
-        await asyncio.sleep(delay)
-        try:
-            payment = Payment.find_one(payment_id)
-            if payment.status == "succeeded":
-                if not has_payment(user_id):
-                    save_yookassa_payment(user_id, payment)
-                await bot.send_message(message.chat.id, "✅ Оплата успешна! Доступ предоставлен.")
-                await send_invite_link(message, user_id, bot)
-                return
-            elif payment.status in ["canceled", "refunded"]:
-                await bot.send_message(message.chat.id, "❌ Платеж отменен.")
-                return
-        except Exception as e:
-            logging.error(f"Ошибка проверки: {e}")
-    await bot.send_message(message.chat.id, "Время проверки истекло. Проверьте статус вручную.")
-
-
 # Функция для проверки участников канала
 async def check_channel_members(bot: Bot):
-    chat_id = "-1002597950609"
+    chat_id = config.CHANNEL_ID
     try:
         # Получаем список участников (ограниченное количество)
         members_count = await bot.get_chat_member_count(chat_id)
@@ -395,16 +319,24 @@ async def check_channel_members(bot: Bot):
 async def handle_join_request(update: types.ChatJoinRequest, bot: Bot):
     user_id = update.from_user.id
 
-    if has_payment(user_id):
+    if await has_payment(user_id):
         # Одобряем запрос, если пользователь оплатил
         await update.approve()
+        membership_cache.update(user_id, "member")
     else:
         # Отклоняем запрос, если оплаты нет
         await update.decline()
+        membership_cache.update(user_id, "left")
 
 
-def check(payment_id):
-    payment = yookassa.Payment.find_one(payment_id)
+# Вступление и выход из канала обновляют кэш членства
+@cb_handler.chat_member(F.chat.id == int(config.CHANNEL_ID))
+async def handle_chat_member(update: types.ChatMemberUpdated):
+    membership_cache.update(update.new_chat_member.user.id, update.new_chat_member.status)
+
+
+async def check(payment_id):
+    payment = await yookassa_client.find_payment(payment_id)
     if payment.status == "succeeded":
         return payment.metadata
     return False
@@ -414,25 +346,19 @@ def check(payment_id):
 @cb_handler.message(Command("check_access"))
 async def check_access(message: Message, bot: Bot):
     user_id = message.from_user.id
-    chat_id = "-1002597950609"
 
-    if has_payment(user_id):
+    if await has_payment(user_id):
         try:
             # Проверяем, является ли пользователь участником канала
-            member = await bot.get_chat_member(chat_id, user_id)
-            if member.status in ["member", "administrator", "creator"]:
+            if await membership_cache.is_member(bot, user_id):
                 await message.answer("✅ Вы имеете доступ к каналу и уже в нём состоите!")
             else:
                 # Создаем новую ссылку, если пользователь оплатил, но не в канале
-                invite_link = await bot.create_chat_invite_link(
-                    chat_id=chat_id,
-                    name=f"New invite for user {user_id}",
-                    expire_date=int(time.time()) + 24 * 3600,
-                    member_limit=1
-                )
+                with outbound_priority(Priority.HIGH):
+                    invite_link = await issue_invite_link(bot, user_id)
 
                 keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(text="Перейти в канал", url=invite_link.invite_link)]
+                    [InlineKeyboardButton(text="Перейти в канал", url=invite_link)]
                 ])
 
                 await message.answer(
@@ -454,12 +380,12 @@ async def scheduled_members_check(bot: Bot):
 
 @cb_handler.callback_query(F.data == 'reviews')
 async def show_reviews_to_user(callback: CallbackQuery, review_service: ReviewService, bot: Bot):
-    msg_data = get_message_by_title("Отзывы о гайде")
+    msg_data = await get_message_by_title("Отзывы о гайде")
     msg_text = msg_data[2]
     try:
-        review_photos = await review_service.get_all_reviews()
+        album, older_cursor = await review_service.get_album()
 
-        if not review_photos:
+        if not album:
             await callback.answer()
             await callback.message.answer("📭 Пока нет отзывов", 
                                         reply_markup=inline.get_back_button())
@@ -467,18 +393,14 @@ async def show_reviews_to_user(callback: CallbackQuery, review_service: ReviewSe
         
         await callback.answer()
         
-        media_group = MediaGroupBuilder()
-        for photo_url in review_photos[:10]:
-            media_group.add_photo(media=photo_url)
-        
         await bot.send_media_group(chat_id=callback.message.chat.id, 
-                                 media=media_group.build())
+                                 media=album)
         
         await bot.send_message(
             chat_id=callback.message.chat.id,
             text=msg_text,
             parse_mode='HTML',
-            reply_markup=inline.add_back_button(inline.buy_keyboard_menu)
+            reply_markup=inline.get_reviews_keyboard(older_cursor)
         )
         
         try:
@@ -495,11 +417,48 @@ async def show_reviews_to_user(callback: CallbackQuery, review_service: ReviewSe
                                     reply_markup=inline.get_back_button())
 
 
+@cb_handler.callback_query(F.data.startswith('reviews_older_'))
+async def show_older_reviews(callback: CallbackQuery, review_service: ReviewService, bot: Bot):
+    """Следующая (более старая) страница отзывов"""
+    await callback.answer()
+    try:
+        cursor = int(callback.data.split("_")[2])
+        reviews, has_older, _ = await review_service.get_reviews_page(cursor)
+
+        if not reviews:
+            await callback.message.answer("📭 Больше отзывов нет",
+                                        reply_markup=inline.get_back_button())
+            return
+
+        await bot.send_media_group(
+            chat_id=callback.message.chat.id,
+            media=[InputMediaPhoto(media=photo_url) for _, photo_url in reviews]
+        )
+
+        msg_data = await get_message_by_title("Отзывы о гайде")
+        await bot.send_message(
+            chat_id=callback.message.chat.id,
+            text=msg_data[2],
+            parse_mode='HTML',
+            reply_markup=inline.get_reviews_keyboard(reviews[-1][0] if has_older else None)
+        )
+
+        try:
+            await callback.message.delete()
+        except Exception as e:
+            logger.error(f"Ошибка удаления сообщения: {e}")
+
+    except Exception as e:
+        logger.error(f"Ошибка показа отзывов: {e}")
+        await callback.message.answer("⚠️ Не удалось загрузить отзывы",
+                                    reply_markup=inline.get_back_button())
+
+
 @cb_handler.callback_query(F.data == 'preview')
 async def handler_preview(callback: CallbackQuery, bot: Bot):
     await callback.answer()
 
-    msg_data = get_message_by_title("Подробнее")
+    msg_data = await get_message_by_title("Подробнее")
     msg_text = msg_data[2]
 
     await callback.message.edit_text(
@@ -512,8 +471,7 @@ async def handler_preview(callback: CallbackQuery, bot: Bot):
 async def handler_back_to_menu(callback: CallbackQuery, bot: Bot, state: FSMContext):
     message_id = int(callback.data.split("_")[3])
     logging.debug(f"Выбрано сообщение с ID {message_id} для возврата в меню")
-    messages = get_all_messages()
-    selected_message = next((msg for msg in messages if msg[0] == message_id), None)
+    selected_message = await get_message_by_id(message_id)
     if selected_message:
         try:
             await bot.edit_message_text(
@@ -543,7 +501,7 @@ async def handler_back_menu(callback: CallbackQuery, bot: Bot):
     await callback.answer()
     await callback.message.delete()
     
-    msg_data = get_message_by_title("Начать")
+    msg_data = await get_message_by_title("Начать")
     msg_text = msg_data[2] 
 
     await callback.message.answer(
@@ -554,7 +512,7 @@ async def handler_back_menu(callback: CallbackQuery, bot: Bot):
 
 @cb_handler.callback_query(F.data == "back_to_menu")
 async def handler_back_to_menu(callback: CallbackQuery, bot: Bot, state: FSMContext):
-    msg_data = get_message_by_title("Начать")
+    msg_data = await get_message_by_title("Начать")
     msg_text = msg_data[2] 
     await callback.answer()
 
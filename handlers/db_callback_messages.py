@@ -4,7 +4,8 @@ from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, C
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
-from services.commands import get_message_by_title, get_all_messages, is_admin, update_message_text
+from services.commands import (get_command_message, get_message_by_id, get_message_titles,
+                               is_admin, update_message_text)
 
 db_cb_router = Router()
 
@@ -13,9 +14,10 @@ class EditMessage(StatesGroup):
 
 @db_cb_router.message(lambda message: message.text and message.text.startswith('/'))
 async def handle_commands(message: Message):
-    command = message.text.lstrip('/').split()[0]
+    # /command@bot_name в группах — отбрасываем имя бота
+    command = message.text.lstrip('/').split()[0].split('@')[0]
     logging.debug(f"Получена команда: {command}")
-    msg = get_message_by_title(command)
+    msg = await get_command_message(command)
     if msg:
         await message.answer(msg[2])
     else:
@@ -24,13 +26,13 @@ async def handle_commands(message: Message):
 @db_cb_router.callback_query(lambda c: c.data == "edit_bot_message" and is_admin(c.from_user.id))
 async def edit_choosen_message(callback: CallbackQuery):
     logging.debug(f"Пользователь {callback.from_user.id} нажал 'Редактировать сообщение'")
-    messages = get_all_messages()
+    messages = await get_message_titles()
     if not messages:
         await callback.message.answer("В базе нет сообщений для редактирования.")
         logging.debug("Нет сообщений для редактирования")
         return
     keyboard = InlineKeyboardMarkup(inline_keyboard=[])
-    for msg_id, title, _ in messages:
+    for msg_id, title in messages:
         if not title or len(title.strip()) == 0:
             title = "Без заголовка"
         title = title[:30]  # Ограничим длину заголовка для кнопки
@@ -45,8 +47,7 @@ async def edit_choosen_message(callback: CallbackQuery):
 async def process_message_selection(callback: CallbackQuery, state: FSMContext):
     message_id = int(callback.data.split("_")[1])
     logging.debug(f"Выбрано сообщение с ID {message_id}")
-    messages = get_all_messages()
-    selected_message = next((msg for msg in messages if msg[0] == message_id), None)
+    selected_message = await get_message_by_id(message_id)
     if selected_message:
         cancel_keyboard = InlineKeyboardMarkup(inline_keyboard=[
             [InlineKeyboardButton(text="Отменить редактирование", callback_data="cancel_edit")]
@@ -81,7 +82,7 @@ async def process_new_text(message: Message, state: FSMContext):
     message_id = data.get("message_id")
     new_text = message.text
     try:
-        update_message_text(message_id, new_text)
+        await update_message_text(message_id, new_text)
         await message.answer("Сообщение успешно обновлено в базе данных!")
         logging.debug(f"Сообщение с ID {message_id} успешно обновлено")
     except Exception as e:
@@ -6,7 +6,7 @@ from aiogram.types import Message
 from keyboards import inline
 
 from services.commands import get_message_by_title
-from services.purchasing import save_or_update_user
+from services.registration import registration_buffer
 
 router = Router()
 
@@ -18,7 +18,7 @@ async def start(message: Message, bot: Bot):
     last_name = message.from_user.last_name
 
 
-    save_or_update_user(
+    registration_buffer.submit(
         user_id=user_id,
         username=username,
         first_name=first_name,
@@ -26,7 +26,7 @@ async def start(message: Message, bot: Bot):
         )
     print(f'User id: {user_id}\nUsername: {username}')
 
-    msg = get_message_by_title("Начать")
+    msg = await get_message_by_title("Начать")
     if msg:
         await message.answer(msg[2],
                              reply_markup=inline.get_start_keyboard())
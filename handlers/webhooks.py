@@ -0,0 +1,134 @@
+from collections import OrderedDict
+import asyncio
+import hmac
+import logging
+
+from aiogram.types import Update
+from fastapi import APIRouter, Request, Response
+from yookassa.domain.common import SecurityHelper
+from yookassa.domain.notification import WebhookNotification
+
+from config import config
+from services.access import confirm_payment
+from services.payment_checks import payment_scheduler
+from services.purchasing import save_yookassa_payment
+from services.yookassa_client import yookassa_client
+
+logger = logging.getLogger(__name__)
+
+webhook_router = APIRouter()
+
+# Уже обработанные уведомления (event:payment_id) — ЮKassa может присылать повторы
+_processed = OrderedDict()
+_PROCESSED_MAX_SIZE = 10000
+
+
+# Задачи обработки обновлений Telegram, запущенные из вебхука
+_update_tasks = set()
+
+
+def _verify(payment, user_id: int, expected_status: str) -> bool:
+    """Сверяет платёж, полученный из API ЮKassa, с данными уведомления"""
+    if payment.status != expected_status:
+        return False
+    try:
+        metadata_user_id = int(payment.metadata["user_id"])
+    except (TypeError, KeyError, ValueError):
+        return False
+    return (metadata_user_id == user_id
+            and payment.amount.currency == "RUB"
+            and float(payment.amount.value) == float(config.COURSE_PRICE))
+
+
+def _remember(key: str):
+    _processed[key] = True
+    while len(_processed) > _PROCESSED_MAX_SIZE:
+        _processed.popitem(last=False)
+
+
+@webhook_router.post(config.YOOKASSA_WEBHOOK_PATH)
+async def yookassa_webhook(request: Request):
+    """Приём уведомлений ЮKassa о смене статуса платежа"""
+    client_ip = request.client.host if request.client else None
+    if config.YOOKASSA_WEBHOOK_CHECK_IP and not SecurityHelper().is_ip_trusted(client_ip):
+        logger.warning(f"Вебхук ЮKassa с недоверенного IP: {client_ip}")
+        return Response(status_code=403)
+
+    try:
+        notification = WebhookNotification(await request.json())
+    except Exception as e:
+        logger.error(f"Некорректное уведомление ЮKassa: {e}")
+        return Response(status_code=400)
+
+    payment = notification.object
+    key = f"{notification.event}:{payment.id}"
+    if key in _processed:
+        return Response(status_code=200)
+
+    try:
+        user_id = int(payment.metadata["user_id"])
+    except (TypeError, KeyError, ValueError):
+        logger.warning(f"В платеже {payment.id} нет user_id в metadata")
+        _remember(key)
+        return Response(status_code=200)
+
+    expected_status = {"payment.succeeded": "succeeded", "payment.canceled": "canceled"}.get(notification.event)
+    if expected_status is None:
+        _remember(key)
+        return Response(status_code=200)
+
+    bot = request.app.state.bot
+    try:
+        # Тело уведомления не подписано — доверяем только статусу из API ЮKassa
+        payment = await yookassa_client.find_payment(payment.id)
+        if not _verify(payment, user_id, expected_status):
+            logger.warning(f"Уведомление {key} не подтверждено API ЮKassa (статус {payment.status})")
+            _remember(key)
+            return Response(status_code=200)
+
+        if expected_status == "succeeded":
+            await confirm_payment(bot, user_id, payment)
+        else:
+            await save_yookassa_payment(user_id, payment)
+            await bot.send_message(user_id, "❌ Платеж отменен.")
+        # Итог известен — автопроверка больше не нужна и не сообщит о нём повторно
+        await payment_scheduler.remove(payment.id)
+    except Exception as e:
+        # Ответ 5xx — ЮKassa повторит уведомление
+        logger.error(f"Ошибка обработки уведомления {key}: {e}")
+        return Response(status_code=500)
+
+    _remember(key)
+    return Response(status_code=200)
+
+
+def _on_update_done(task: asyncio.Task):
+    _update_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Ошибка обработки обновления: {task.exception()!r}")
+
+
+@webhook_router.post(config.TELEGRAM_WEBHOOK_PATH)
+async def telegram_webhook(request: Request):
+    """Приём обновлений Telegram в режиме webhook"""
+    if config.BOT_MODE != "webhook":
+        return Response(status_code=404)
+    # Без секрета любой мог бы прислать поддельное обновление от имени админа
+    secret = getattr(request.app.state, "telegram_webhook_secret", None)
+    received = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not secret or not hmac.compare_digest(received.encode(), secret.encode()):
+        return Response(status_code=403)
+
+    bot = request.app.state.bot
+    dp = request.app.state.dp
+    try:
+        update = Update.model_validate(await request.json(), context={"bot": bot})
+    except Exception as e:
+        logger.error(f"Некорректное обновление Telegram: {e}")
+        return Response(status_code=400)
+
+    # Отвечаем Telegram сразу, обработка идёт в фоне
+    task = asyncio.create_task(dp.feed_update(bot, update))
+    _update_tasks.add(task)
+    task.add_done_callback(_on_update_done)
+    return Response(status_code=200)
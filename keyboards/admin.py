@@ -1,19 +1,69 @@
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
 
-def get_admin_kb():
-    """Основная клавиатура админ-панели"""
+def _build_admin_kb():
     builder = InlineKeyboardBuilder()
     builder.button(text="➕ Добавить отзыв", callback_data="admin_add_review")
     builder.button(text="🗑 Удалить отзывы", callback_data="admin_delete_reviews")
     builder.button(text="👀 Показать все", callback_data="admin_list_reviews")
     builder.button(text="Редактировать сообщение", callback_data="edit_bot_message")
+    builder.button(text="📣 Рассылка", callback_data="admin_broadcast")
     builder.button(text="🔙 Выход", callback_data="admin_exit")
-    builder.adjust(2, 2, 1)
+    builder.adjust(2, 2, 1, 1)
+    return builder.as_markup()
+
+def _build_back_kb():
+    builder = InlineKeyboardBuilder()
+    builder.button(text="🔙 Назад", callback_data="admin_back")
     return builder.as_markup()
 
+def _build_broadcast_confirm_kb():
+    builder = InlineKeyboardBuilder()
+    builder.button(text="✅ Отправить всем", callback_data="admin_broadcast_confirm")
+    builder.button(text="❌ Отмена", callback_data="admin_broadcast_cancel")
+    builder.adjust(1)
+    return builder.as_markup()
+
+# Статические клавиатуры собираются один раз и переиспользуются (модели aiogram frozen)
+_ADMIN_KB = _build_admin_kb()
+_BACK_KB = _build_back_kb()
+_BROADCAST_CONFIRM_KB = _build_broadcast_confirm_kb()
+
+def get_admin_kb():
+    """Основная клавиатура админ-панели"""
+    return _ADMIN_KB
+
 def get_back_kb():
     """Клавиатура с кнопкой Назад"""
+    return _BACK_KB
+
+def get_broadcast_confirm_kb():
+    """Подтверждение запуска рассылки"""
+    return _BROADCAST_CONFIRM_KB
+
+def get_delete_reviews_kb(reviews: list[tuple[int, str]], has_older: bool, has_newer: bool):
+    """Страница отзывов для удаления с кнопками листания"""
     builder = InlineKeyboardBuilder()
-    builder.button(text="🔙 Назад", callback_data="admin_back")
-    return builder.as_markup()
\ No newline at end of file
+    for review_id, _ in reviews:
+        builder.button(
+            text=f"❌ {review_id}",
+            callback_data=f"del_preview_{review_id}"
+        )
+    sizes = [3] * (len(reviews) // 3)
+    if len(reviews) % 3:
+        sizes.append(len(reviews) % 3)
+
+    nav = 0
+    if has_newer:
+        builder.button(text="⬅️ Новее", callback_data=f"admin_del_newer_{reviews[0][0]}")
+        nav += 1
+    if has_older:
+        builder.button(text="Старее ➡️", callback_data=f"admin_del_older_{reviews[-1][0]}")
+        nav += 1
+    if nav:
+        sizes.append(nav)
+
+    builder.button(text="🔙 В админку", callback_data="admin_back")
+    sizes.append(1)
+    builder.adjust(*sizes)
+    return builder.as_markup()
@@ -1,12 +1,22 @@
 from aiogram.types import (InlineKeyboardButton, InlineKeyboardMarkup,)
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+# Статические клавиатуры собираются один раз при импорте и переиспользуются:
+# модели aiogram неизменяемы (frozen), поэтому общий экземпляр безопасен.
+# Не изменяйте списки inline_keyboard у возвращаемых клавиатур — копируйте
+# через InlineKeyboardBuilder.from_markup, как в add_back_button.
+
+PRIVACY_POLICY_URL = 'https://docs.google.com/document/d/1_01AHDErOBo8EiK_ugseiOJQ_OuxK00C/edit?tab=t.0'
+OFFER_URL = 'https://docs.google.com/document/d/1hdaA1hLhKb2vc234-WTVu-33h1viylU-/edit?tab=t.0'
+
+_START_KEYBOARD = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text='Купить', callback_data='buy')],
+    [InlineKeyboardButton(text='Подробнее', callback_data='preview')],
+    [InlineKeyboardButton(text='Поддержка', url='https://t.me/zemlyaservice')],
+])
+
 def get_start_keyboard() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text='Купить', callback_data='buy')],
-        [InlineKeyboardButton(text='Подробнее', callback_data='preview')],
-        [InlineKeyboardButton(text='Поддержка', url='https://t.me/zemlyaservice')],
-    ])
+    return _START_KEYBOARD
 
 
 buy_keyboard_menu = InlineKeyboardMarkup(inline_keyboard=[
@@ -14,38 +24,96 @@ buy_keyboard_menu = InlineKeyboardMarkup(inline_keyboard=[
 ])
 
 
+_BUY_BUTTON = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text='Не получается оплатить', url='https://t.me/zemlyaservice')],
+    [InlineKeyboardButton(text='В меню', callback_data='back_menu')],
+])
+
 def get_buy_button() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text='Не получается оплатить', url='https://t.me/zemlyaservice')],
-        [InlineKeyboardButton(text='В меню', callback_data='back_menu')],
-    ])
+    return _BUY_BUTTON
+
+_SUPPORT_BUTTON = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text='Не получается оплатить', url='https://t.me/zemlyaservice')],
+])
 
 def get_support_button() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text='Не получается оплатить', url='https://t.me/zemlyaservice')],
-    ])
+    return _SUPPORT_BUTTON
+
+_PRESS_TO_BUY_BUTTON = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text='Купить', callback_data='buy')],
+    [InlineKeyboardButton(text='Назад', callback_data='back_to_menu')],
+])
 
 def get_press_to_buy_button() -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text='Купить', callback_data='buy')],
-        [InlineKeyboardButton(text='Назад', callback_data='back_to_menu')],
-    ])
+    return _PRESS_TO_BUY_BUTTON
 
-def get_back_button() -> InlineKeyboardMarkup:
-    """Создает клавиатуру с кнопкой 'Назад'"""
+def _build_back_button() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="⬅️ Назад", callback_data="back_to_menu")
     return builder.as_markup()
 
-def add_back_button(keyboard: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
-    """Добавляет кнопку 'Назад' к существующей клавиатуре"""
+_BACK_BUTTON = _build_back_button()
+
+def get_back_button() -> InlineKeyboardMarkup:
+    """Клавиатура с кнопкой 'Назад'"""
+    return _BACK_BUTTON
+
+def _build_with_back_button(keyboard: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder.from_markup(keyboard)
     builder.button(text="⬅️ Назад", callback_data="back_to_menu")
     builder.adjust(1)
     return builder.as_markup()
 
+# Готовые варианты для общих клавиатур модуля (ключ — id исходной клавиатуры)
+_WITH_BACK_BUTTON = {
+    id(keyboard): _build_with_back_button(keyboard)
+    for keyboard in (buy_keyboard_menu, _BUY_BUTTON, _SUPPORT_BUTTON, _PRESS_TO_BUY_BUTTON)
+}
+
+def add_back_button(keyboard: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
+    """Добавляет кнопку 'Назад' к существующей клавиатуре"""
+    prepared = _WITH_BACK_BUTTON.get(id(keyboard))
+    if prepared is not None:
+        return prepared
+    return _build_with_back_button(keyboard)
+
+def get_reviews_keyboard(older_cursor: int | None = None) -> InlineKeyboardMarkup:
+    """Клавиатура под отзывами; older_cursor — id, с которого начинается следующая страница"""
+    keyboard = [[InlineKeyboardButton(text='Купить', callback_data='buy')]]
+    if older_cursor:
+        keyboard.append([InlineKeyboardButton(text='📸 Ещё отзывы', callback_data=f'reviews_older_{older_cursor}')])
+    keyboard.append([InlineKeyboardButton(text='⬅️ Назад', callback_data='back_to_menu')])
+    return InlineKeyboardMarkup(inline_keyboard=keyboard)
+
+_CONTINUE_BUTTON = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="Продолжить", callback_data="continue_to_consent")]
+])
+
 def get_continue_button():
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="Продолжить", callback_data="continue_to_consent")]
+    return _CONTINUE_BUTTON
+
+def _build_consent_keyboard(data_consent: bool, offer_consent: bool) -> InlineKeyboardMarkup:
+    data_text = "✓ Согласен с обработкой данных" if data_consent else "Согласен с обработкой данных"
+    offer_text = "✓ Акцептую оферту" if offer_consent else "Акцептую оферту"
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text='Политика конфиденциальности', url=PRIVACY_POLICY_URL),
+            InlineKeyboardButton(text='Оферта', url=OFFER_URL),
+        ],
+        [
+            InlineKeyboardButton(text=data_text, callback_data="consent_data"),
+            InlineKeyboardButton(text=offer_text, callback_data="consent_offer"),
+        ],
+        [InlineKeyboardButton(text="Продолжить", callback_data="proceed_to_payment")]
     ])
-    return keyboard
\ No newline at end of file
+
+# Все четыре сочетания согласий
+_CONSENT_KEYBOARDS = {
+    (data_consent, offer_consent): _build_consent_keyboard(data_consent, offer_consent)
+    for data_consent in (False, True)
+    for offer_consent in (False, True)
+}
+
+def get_consent_keyboard(data_consent: bool, offer_consent: bool) -> InlineKeyboardMarkup:
+    """Клавиатура согласий с отметками об уже подтверждённых пунктах"""
+    return _CONSENT_KEYBOARDS[(bool(data_consent), bool(offer_consent))]
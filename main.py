@@ -1,18 +1,36 @@
+import time
+
+# Отсчёт времени запуска начинается до тяжёлых импортов
+_process_started = time.perf_counter()
+
 from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram import Bot, Dispatcher, F, types
-from fastapi import FastAPI, Request
-from yookassa.domain.notification import WebhookNotification
-import uvicorn
 
 from handlers import callbacks, admin, start, db_callback_messages
 from services.reviews import ReviewService
+from services import database, commands, migrations, payment_checks, metrics
+from services.membership import membership_cache
+from services.loop_watchdog import loop_watchdog
+from services.yookassa_client import yookassa_client
+from services.entitlements import entitlements
+from services.registration import registration_buffer
+from services.broadcast import broadcast_engine
+from services.invite_pool import invite_pool
 
 from middlewares.admin import AdminPhotoMiddleware
+from middlewares.recorder import UpdateRecorderMiddleware
+from services.update_recorder import update_recorder
+from middlewares.outbound import OutboundRateLimitMiddleware
+from middlewares.metrics import HandlerMetricsMiddleware, TelegramMetricsMiddleware
+from services.outbound import outbound_scheduler
 
 from config import config
 
 import logging
 import asyncio
+import secrets
 
 # Инициализация логирования
 logging.basicConfig(
@@ -23,9 +41,12 @@ logger = logging.getLogger(__name__)
 
 # Инициализация базовых компонентов
 storage = MemoryStorage()
-bot = Bot(token=config.BOT_TOKEN)
+if config.TELEGRAM_API_URL:
+    bot = Bot(token=config.BOT_TOKEN,
+              session=AiohttpSession(api=TelegramAPIServer.from_base(config.TELEGRAM_API_URL)))
+else:
+    bot = Bot(token=config.BOT_TOKEN)
 dp = Dispatcher(storage=storage)
-app = FastAPI()
 
 # Инициализация сервисов
 review_service = ReviewService()
@@ -39,13 +60,171 @@ dp.include_router(db_callback_messages.db_cb_router)
 
 # Middleware
 dp.message.middleware(AdminPhotoMiddleware())
+if config.UPDATE_RECORDER_ENABLED:
+    dp.update.outer_middleware(UpdateRecorderMiddleware(update_recorder))
+bot.session.middleware(OutboundRateLimitMiddleware(outbound_scheduler, config.OUTBOUND_MAX_RETRIES))
+# Внутри ограничителя: измеряется сам запрос, без ожидания очереди
+bot.session.middleware(TelegramMetricsMiddleware())
+
+# Метрики хендлеров по роутерам
+for router_name, router in (
+    ("start", start.router),
+    ("admin", admin.admin_router),
+    ("callbacks", callbacks.cb_handler),
+    ("db_messages", db_callback_messages.db_cb_router),
+):
+    for event_name in ("message", "callback_query", "chat_join_request", "chat_member"):
+        router.observers[event_name].middleware(HandlerMetricsMiddleware(router_name, event_name))
+
+metrics.PENDING_PAYMENT_CHECKS.set_function(lambda: payment_checks.payment_scheduler.pending)
+metrics.cache_collector.watch("messages", commands.message_cache.stats)
+metrics.cache_collector.watch("commands", commands.command_table.stats)
+metrics.cache_collector.watch("membership", membership_cache.stats)
+metrics.cache_collector.watch("reviews_album", review_service.album_stats)
+metrics.cache_collector.watch("user_consents", callbacks.user_consents.stats)
+
+
+# Этапы запуска: (название, длительность в секундах)
+startup_phases = [("imports", time.perf_counter() - _process_started)]
+
+
+async def _timed(name: str, coro):
+    started = time.perf_counter()
+    result = await coro
+    startup_phases.append((name, time.perf_counter() - started))
+    return result
+
+
+def startup_report() -> str:
+    phases = ", ".join(f"{name} {duration * 1000:.0f} мс" for name, duration in startup_phases)
+    return f"Запуск за {(time.perf_counter() - _process_started) * 1000:.0f} мс ({phases})"
+
+
+async def on_startup():
+    if config.LOOP_WATCHDOG_ENABLED:
+        # Включается первым, чтобы видеть и блокировки во время прогрева
+        loop_watchdog.start()
+    await _timed("db_pool", database.init_pool())
+    # Схема нужна до прогрева кэшей, а профиль бота — нет
+    await asyncio.gather(
+        _timed("migrations", migrations.run_migrations()),
+        _timed("bot_me", bot.me()),
+    )
+    await asyncio.gather(
+        _timed("messages_cache", commands.load_messages()),
+        _timed("entitlements", entitlements.start()),
+        _timed("payment_scheduler", payment_checks.payment_scheduler.start(bot)),
+        _timed("broadcasts", broadcast_engine.resume(bot)),
+    )
+    if config.PLAN_CHECK_ON_STARTUP:
+        await _timed("plan_check", migrations.check_hot_queries())
+    registration_buffer.start()
+    invite_pool.start(bot)
+    metrics.loop_lag_monitor.start()
+    if config.METRICS_ENABLED:
+        metrics.start_metrics_server(config.METRICS_HOST, config.METRICS_PORT)
+    if config.UPDATE_RECORDER_ENABLED:
+        update_recorder.start()
+    logger.info(startup_report())
+
+
+async def on_shutdown():
+    await metrics.loop_lag_monitor.stop()
+    await loop_watchdog.stop()
+    await update_recorder.stop()
+    await broadcast_engine.stop()
+    await invite_pool.stop()
+    await payment_checks.payment_scheduler.stop()
+    await entitlements.stop()
+    await registration_buffer.stop()
+    await yookassa_client.close()
+    await database.close_pool()
+
+dp.startup.register(on_startup)
+dp.shutdown.register(on_shutdown)
+
+
+def create_app(telegram_webhook_secret: str = None):
+    # FastAPI нужен только при включённом HTTP-сервере — импортируем по требованию
+    from fastapi import FastAPI
+    from handlers import webhooks
+
+    app = FastAPI()
+    app.state.bot = bot
+    app.state.dp = dp
+    app.state.telegram_webhook_secret = telegram_webhook_secret
+    app.include_router(webhooks.webhook_router)
+    return app
+
+
+def create_server(telegram_webhook_secret: str = None):
+    import uvicorn
+
+    return uvicorn.Server(uvicorn.Config(
+        create_app(telegram_webhook_secret),
+        host=config.WEB_SERVER_HOST,
+        port=config.WEB_SERVER_PORT,
+        log_level="info"
+    ))
+
+
+async def run_polling():
+    await bot.delete_webhook(drop_pending_updates=True)
+    if not config.WEB_SERVER_ENABLED:
+        await dp.start_polling(bot)
+        return
+
+    # Polling работает рядом с HTTP-сервером вебхуков ЮKassa;
+    # сигналы остановки обрабатывает uvicorn
+    server = create_server()
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False))
+    serving = asyncio.create_task(server.serve())
+    try:
+        # Падение polling (например, ошибка on_startup) должно завершать процесс,
+        # а не оставлять работающий HTTP-сервер с мёртвым ботом
+        await asyncio.wait({polling, serving}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not polling.done():
+            try:
+                await dp.stop_polling()
+            except RuntimeError:
+                pass
+        if not serving.done():
+            server.should_exit = True
+        await asyncio.wait({polling, serving})
+    # Пробрасываем исключение polling, затем сервера
+    polling.result()
+    serving.result()
+
+
+async def run_webhook():
+    if not config.WEBHOOK_BASE_URL:
+        raise RuntimeError("Для режима webhook нужен WEBHOOK_BASE_URL")
+
+    # Вебхук без секрета не принимаем: если он не задан, генерируем на время запуска
+    secret = config.TELEGRAM_WEBHOOK_SECRET or secrets.token_urlsafe(32)
+
+    await dp.emit_startup(bot=bot)
+    try:
+        await bot.set_webhook(
+            url=f"{config.WEBHOOK_BASE_URL.rstrip('/')}{config.TELEGRAM_WEBHOOK_PATH}",
+            secret_token=secret,
+            allowed_updates=dp.resolve_used_update_types(),
+            drop_pending_updates=True
+        )
+        await create_server(secret).serve()
+    finally:
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
 
 
 # Функция для запуска бота
 async def start_bot():
     try:
-        await bot.delete_webhook(drop_pending_updates=True)
-        await dp.start_polling(bot)
+        if config.BOT_MODE == "webhook":
+            await run_webhook()
+        else:
+            await run_polling()
     except Exception as e:
         logger.error(f"Error starting bot: {e}")
         raise
@@ -0,0 +1,43 @@
+import time
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramAPIError
+
+from services import metrics
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Время обработки и ошибки хендлеров одного роутера"""
+
+    def __init__(self, router: str, event: str):
+        self.latency = metrics.HANDLER_LATENCY.labels(router, event)
+        self.errors = metrics.HANDLER_ERRORS.labels(router, event)
+
+    async def __call__(self, handler, event, data):
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.errors.inc()
+            raise
+        finally:
+            self.latency.observe(time.perf_counter() - started)
+
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """Время и ошибки запросов к Bot API по методам"""
+
+    async def __call__(self, make_request, bot, method):
+        name = type(method).__name__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except TelegramAPIError as e:
+            metrics.TELEGRAM_API_ERRORS.labels(name, type(e).__name__).inc()
+            raise
+        except Exception:
+            metrics.TELEGRAM_API_ERRORS.labels(name, "network").inc()
+            raise
+        finally:
+            metrics.TELEGRAM_API_LATENCY.labels(name).observe(time.perf_counter() - started)
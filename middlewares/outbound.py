@@ -0,0 +1,47 @@
+import asyncio
+import logging
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+
+from services.outbound import OutboundScheduler, current_priority
+
+logger = logging.getLogger(__name__)
+
+# Методы, на которые распространяются лимиты Telegram на отправку сообщений
+RATE_LIMITED_METHODS = {
+    "SendMessage", "SendPhoto", "SendMediaGroup", "SendDocument", "SendVideo",
+    "CopyMessage", "ForwardMessage",
+    "EditMessageText", "EditMessageCaption", "EditMessageReplyMarkup", "EditMessageMedia",
+    # Пополнение пула ссылок идёт с низким приоритетом и уступает ответам пользователям
+    "CreateChatInviteLink",
+}
+
+
+class OutboundRateLimitMiddleware(BaseRequestMiddleware):
+    """Пропускает запросы к Bot API через планировщик исходящих сообщений
+    и повторяет их после 429 (retry_after)"""
+
+    def __init__(self, scheduler: OutboundScheduler, max_retries: int):
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+
+    async def __call__(self, make_request, bot, method):
+        chat_id = getattr(method, "chat_id", None)
+        limited = type(method).__name__ in RATE_LIMITED_METHODS and chat_id is not None
+        priority = current_priority()
+
+        for attempt in range(self.max_retries + 1):
+            if limited:
+                await self.scheduler.acquire(chat_id, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(
+                    f"Flood limit на {type(method).__name__} (chat_id={chat_id}), "
+                    f"повтор через {e.retry_after} сек"
+                )
+                self.scheduler.retry_after(chat_id if limited else None, e.retry_after)
+                await asyncio.sleep(e.retry_after)
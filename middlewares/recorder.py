@@ -0,0 +1,23 @@
+import logging
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+from services.update_recorder import UpdateRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateRecorderMiddleware(BaseMiddleware):
+    """Передаёт каждое входящее обновление в лог для воспроизведения"""
+
+    def __init__(self, recorder: UpdateRecorder):
+        self.recorder = recorder
+
+    async def __call__(self, handler, event, data):
+        if isinstance(event, Update):
+            try:
+                self.recorder.record(event.model_dump(mode="json", exclude_none=True))
+            except Exception as e:
+                logger.debug(f"Не удалось записать обновление: {e}")
+        return await handler(event, data)
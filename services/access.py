@@ -0,0 +1,77 @@
+import logging
+import time
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from config import config
+from services.purchasing import claim_succeeded_payment, save_invite_link
+from services.outbound import Priority, outbound_priority
+from services.invite_pool import invite_pool
+
+logger = logging.getLogger(__name__)
+
+async def issue_invite_link(bot: Bot, user_id: int) -> str:
+    """Выдаёт пользователю одноразовую ссылку в канал и сохраняет её в user_links"""
+    invite_link = await invite_pool.assign(user_id)
+    if invite_link is None:
+        # Пул пуст — создаём ссылку напрямую, как раньше
+        logger.warning(f"Пул ссылок пуст, создаём ссылку для {user_id} напрямую")
+        created = await bot.create_chat_invite_link(
+            chat_id=config.CHANNEL_ID,
+            name=f"Invite for user {user_id}",
+            expire_date=int(time.time()) + 24 * 3600,  # 24 часа
+            member_limit=1  # Одноразовая ссылка
+        )
+        invite_link = created.invite_link
+
+    await save_invite_link(user_id, invite_link)
+    return invite_link
+
+
+async def send_invite_link(bot: Bot, chat_id: int, user_id: int):
+    """Функция для отправки инвайт-ссылки"""
+    with outbound_priority(Priority.HIGH):
+        await _send_invite_link(bot, chat_id, user_id)
+
+
+async def _send_invite_link(bot: Bot, chat_id: int, user_id: int):
+    try:
+        invite_link = await issue_invite_link(bot, user_id)
+
+        # Создание клавиатуры с кнопкой
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="Перейти в канал", url=invite_link)]
+        ])
+
+        # Отправка сообщения
+        await bot.send_message(
+            chat_id,
+            """
+Ваш доступ к материалам курса находится в закрытом Telegram-канале. 
+
+**Важно**: 
+- Она одноразовая и предназначена только для вас
+- Не передавайте её другим!""",
+            reply_markup=keyboard,
+            parse_mode="Markdown"
+        )
+
+    except Exception as e:
+        await bot.send_message(chat_id, "❌ Произошла ошибка при создании доступа. Обратитесь в поддержку.")
+        print(f"Error creating invite link: {e}")
+
+
+async def confirm_payment(bot: Bot, user_id: int, payment) -> bool:
+    """Сохраняет успешный платёж и выдаёт доступ.
+
+    Возвращает False, если доступ по этому платежу уже был выдан."""
+    if not await claim_succeeded_payment(user_id, payment):
+        return False
+
+    # Личный чат с ботом совпадает с user_id
+    with outbound_priority(Priority.HIGH):
+        await bot.send_message(user_id, "✅ Оплата успешна! Доступ предоставлен.")
+        await _send_invite_link(bot, user_id, user_id)
+    logger.info(f"Доступ выдан: user_id={user_id}, payment_id={payment.id}")
+    return True
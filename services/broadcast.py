@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import time
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+
+from config import config
+from services import database
+from services.outbound import Priority, outbound_priority
+
+logger = logging.getLogger(__name__)
+
+# Как часто (сек) записывать завершённые доставки внутри пачки
+DELIVERY_RECORD_INTERVAL = 1.0
+# Сколько раз повторять пачку с временными ошибками и пауза (сек) перед повтором
+TRANSIENT_RETRIES = 3
+TRANSIENT_RETRY_DELAY = 5.0
+
+
+class BroadcastEngine:
+    """Рассылка сообщения всем пользователям из таблицы users.
+
+    Получатели читаются пачками по возрастанию user_id (keyset), результат
+    доставки каждому пишется в broadcast_deliveries, а позиция — в broadcasts,
+    поэтому после падения рассылка продолжается с места остановки.
+    Отправка идёт с низким приоритетом через общий планировщик исходящих
+    сообщений и не задерживает обычные ответы бота."""
+
+    def __init__(self, batch_size: int, concurrency: int, progress_interval: float):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self._tasks = {}
+
+    async def create(self, admin_id: int, text: str) -> int:
+        row = await database.fetchone("SELECT COUNT(*) FROM users")
+        total = row[0] if row else 0
+        async with database.get_pool().acquire() as conn:
+            cursor = await conn.cursor(buffered=True)
+            try:
+                await cursor.execute("""
+                    INSERT INTO broadcasts (admin_id, text, status, total)
+                    VALUES (%s, %s, 'running', %s)
+                """, (admin_id, text, total))
+                return cursor.lastrowid
+            finally:
+                await cursor.close()
+
+    def start(self, bot: Bot, broadcast_id: int):
+        if broadcast_id in self._tasks:
+            return
+        task = asyncio.create_task(self._run(bot, broadcast_id))
+        self._tasks[broadcast_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(broadcast_id, None))
+
+    async def resume(self, bot: Bot):
+        """Продолжает рассылки, прерванные перезапуском"""
+        rows = await database.fetchall("SELECT id FROM broadcasts WHERE status = 'running'")
+        for (broadcast_id,) in rows:
+            logger.info(f"Продолжаем рассылку #{broadcast_id}")
+            self.start(bot, broadcast_id)
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def is_running(self) -> bool:
+        return bool(self._tasks)
+
+    async def _deliver(self, bot: Bot, semaphore: asyncio.Semaphore, user_id: int, text: str):
+        async with semaphore:
+            try:
+                with outbound_priority(Priority.LOW):
+                    await bot.send_message(user_id, text)
+                return user_id, "sent", None
+            except TelegramForbiddenError as e:
+                return user_id, "blocked", str(e)[:255]
+            except TelegramBadRequest as e:
+                return user_id, "failed", str(e)[:255]
+            except Exception as e:
+                # Временная ошибка (сеть, таймаут) — не записываем, отправка будет повторена
+                logger.error(f"Рассылка: ошибка отправки {user_id}: {e}")
+                return user_id, None, str(e)[:255]
+
+    async def _record(self, broadcast_id: int, unrecorded: list):
+        if not unrecorded:
+            return
+        records, unrecorded[:] = list(unrecorded), []
+        try:
+            await database.executemany("""
+                INSERT IGNORE INTO broadcast_deliveries (broadcast_id, user_id, status, error)
+                VALUES (%s, %s, %s, %s)
+            """, [(broadcast_id, *result) for result in records])
+        except BaseException:
+            # Вернём записи, чтобы их повторила следующая попытка
+            unrecorded[:0] = records
+            raise
+
+    async def _deliver_batch(self, bot: Bot, semaphore: asyncio.Semaphore, broadcast_id: int,
+                             user_ids: list[int], text: str) -> list:
+        """Отправляет пачку, записывая доставки по мере завершения.
+
+        Уже отправленные сообщения попадают в broadcast_deliveries и при отмене
+        или ошибке, иначе resume() отправил бы их повторно. Временные ошибки
+        возвращаются со статусом None и не записываются."""
+        results = []
+        unrecorded = []
+
+        async def deliver(user_id: int):
+            result = await self._deliver(bot, semaphore, user_id, text)
+            results.append(result)
+            if result[1] is not None:
+                unrecorded.append(result)
+
+        tasks = [asyncio.create_task(deliver(user_id)) for user_id in user_ids]
+        try:
+            waiting = set(tasks)
+            while waiting:
+                _, waiting = await asyncio.wait(waiting, timeout=DELIVERY_RECORD_INTERVAL)
+                await self._record(broadcast_id, unrecorded)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._record(broadcast_id, unrecorded)
+        return results
+
+    async def _report(self, bot: Bot, admin_id: int, progress_message, text: str):
+        try:
+            if progress_message is None:
+                return await bot.send_message(admin_id, text)
+            await bot.edit_message_text(text, chat_id=admin_id, message_id=progress_message.message_id)
+        except Exception as e:
+            logger.debug(f"Не удалось обновить прогресс рассылки: {e}")
+        return progress_message
+
+    async def _counts(self, broadcast_id: int) -> tuple[int, int]:
+        """Счётчики по записанным доставкам: в broadcasts они могли отстать от
+        доставок, записанных до падения посреди пачки"""
+        sent = failed = 0
+        for status, count in await database.fetchall("""
+            SELECT status, COUNT(*) FROM broadcast_deliveries
+            WHERE broadcast_id = %s GROUP BY status
+        """, (broadcast_id,)):
+            if status == "sent":
+                sent += count
+            else:
+                failed += count
+        return sent, failed
+
+    async def _run(self, bot: Bot, broadcast_id: int):
+        row = await database.fetchone("""
+            SELECT admin_id, text, total, last_user_id
+            FROM broadcasts WHERE id = %s
+        """, (broadcast_id,))
+        if not row:
+            return
+        admin_id, text, total, last_user_id = row
+        sent, failed = await self._counts(broadcast_id)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+        done_this_run = 0
+        retries = 0
+        progress_message = await self._report(
+            bot, admin_id, None, f"📣 Рассылка #{broadcast_id} запущена: 0/{total}"
+        )
+        last_report = time.monotonic()
+
+        try:
+            while True:
+                users = await database.fetchall(
+                    "SELECT user_id FROM users WHERE user_id > %s ORDER BY user_id LIMIT %s",
+                    (last_user_id, self.batch_size)
+                )
+                if not users:
+                    break
+                user_ids = [user[0] for user in users]
+
+                # Доставки пишутся по ходу пачки — после перезапуска пропускаем их
+                placeholders = ", ".join(["%s"] * len(user_ids))
+                delivered = {
+                    r[0] for r in await database.fetchall(
+                        f"SELECT user_id FROM broadcast_deliveries "
+                        f"WHERE broadcast_id = %s AND user_id IN ({placeholders})",
+                        (broadcast_id, *user_ids)
+                    )
+                }
+                pending = [user_id for user_id in user_ids if user_id not in delivered]
+
+                results = await self._deliver_batch(bot, semaphore, broadcast_id, pending, text)
+
+                done = [result for result in results if result[1] is not None]
+                transient = [result for result in results if result[1] is None]
+                batch_sent = sum(1 for result in done if result[1] == "sent")
+                sent += batch_sent
+                failed += len(done) - batch_sent
+                done_this_run += len(done)
+                if transient and retries < TRANSIENT_RETRIES:
+                    # Позицию не двигаем: записанные доставки пропустятся, остальные
+                    # повторятся на следующем шаге или после перезапуска
+                    retries += 1
+                    await asyncio.sleep(TRANSIENT_RETRY_DELAY * retries)
+                else:
+                    if transient:
+                        # Повторы исчерпаны — записываем доставку как неудачную
+                        await self._record(broadcast_id, [
+                            (user_id, "failed", error) for user_id, _, error in transient
+                        ])
+                        failed += len(transient)
+                        done_this_run += len(transient)
+                    retries = 0
+                    last_user_id = user_ids[-1]
+                await database.execute("""
+                    UPDATE broadcasts SET last_user_id = %s, sent = %s, failed = %s
+                    WHERE id = %s
+                """, (last_user_id, sent, failed, broadcast_id))
+
+                if time.monotonic() - last_report >= self.progress_interval:
+                    rate = done_this_run / max(time.monotonic() - started, 1e-6)
+                    progress_message = await self._report(
+                        bot, admin_id, progress_message,
+                        f"📣 Рассылка #{broadcast_id}: {sent + failed}/{total}\n"
+                        f"✅ {sent}  ❌ {failed}  ⚡ {rate:.1f} сообщ./сек"
+                    )
+                    last_report = time.monotonic()
+        except asyncio.CancelledError:
+            # Позиция сохранена — рассылка продолжится после перезапуска
+            raise
+        except Exception as e:
+            logger.error(f"Рассылка #{broadcast_id} прервана: {e}")
+            await database.execute("UPDATE broadcasts SET status = 'failed' WHERE id = %s", (broadcast_id,))
+            await self._report(bot, admin_id, progress_message, f"⚠️ Рассылка #{broadcast_id} прервана: {e}")
+            return
+
+        await database.execute("""
+            UPDATE broadcasts SET status = 'finished', finished_at = CURRENT_TIMESTAMP
+            WHERE id = %s
+        """, (broadcast_id,))
+        elapsed = time.monotonic() - started
+        await self._report(
+            bot, admin_id, progress_message,
+            f"✅ Рассылка #{broadcast_id} завершена за {elapsed:.0f} сек\n"
+            f"Доставлено: {sent}, ошибок: {failed}"
+        )
+
+
+broadcast_engine = BroadcastEngine(
+    batch_size=config.BROADCAST_BATCH_SIZE,
+    concurrency=config.BROADCAST_CONCURRENCY,
+    progress_interval=config.BROADCAST_PROGRESS_INTERVAL
+)
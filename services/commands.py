@@ -1,52 +1,204 @@
-import mysql.connector
 import logging
 from config import config
+from services import database
+from services.ttl_cache import TTLCache
 
-def get_mysql_conn():
-    return mysql.connector.connect(**config.MYSQL_CONFIG)
 
-def init_db():
+class MessageCache:
+    """Кэш текстов бота в памяти процесса (по title и по id)"""
+
+    def __init__(self):
+        self._by_title = {}
+        self._by_id = {}
+        self._titles = None
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, rows):
+        by_title = {}
+        for row in rows:
+            by_title.setdefault(row[1], row)
+        self._by_title = by_title
+        self._by_id = {row[0]: row for row in rows}
+        self._titles = None
+        self.loaded = True
+
+    def put(self, row):
+        old = self._by_id.get(row[0])
+        if old and old[1] != row[1] and self._by_title.get(old[1]) is old:
+            del self._by_title[old[1]]
+        self._by_id[row[0]] = row
+        self._by_title[row[1]] = row
+        self._titles = None
+
+    def invalidate(self, message_id: int):
+        old = self._by_id.pop(message_id, None)
+        if old and self._by_title.get(old[1]) is old:
+            del self._by_title[old[1]]
+        self._titles = None
+
+    def get_by_title(self, title: str):
+        row = self._by_title.get(title)
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row
+
+    def get_by_id(self, message_id: int):
+        row = self._by_id.get(message_id)
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row
+
+    def titles(self) -> list[tuple[int, str]]:
+        """(id, title) всех текстов, отсортированные по title"""
+        if self._titles is None:
+            self._titles = sorted(
+                ((row[0], row[1]) for row in self._by_id.values()),
+                key=lambda item: item[1].lower()
+            )
+        return self._titles
+
+    def stats(self) -> dict:
+        return {"size": len(self._by_id), "hits": self.hits, "misses": self.misses}
+
+
+message_cache = MessageCache()
+
+
+class CommandTable:
+    """Ответы на произвольные /команды, собранные из таблицы messages.
+
+    После загрузки таблица полная: неизвестная команда отвечается из памяти
+    без запроса к БД. Пока таблица не загружена, неизвестные команды
+    запоминаются в ограниченном негативном кэше."""
+
+    def __init__(self, negative_cache_size: int, negative_cache_ttl: float):
+        self._commands = {}
+        self._unknown = TTLCache(max_size=negative_cache_size, ttl=negative_cache_ttl)
+        self.loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(title: str) -> str:
+        # В MySQL сравнение title регистронезависимое — сохраняем это поведение
+        return title.casefold()
+
+    @staticmethod
+    def _is_command(title: str) -> bool:
+        # Заголовок с пробелами не может прийти как /команда
+        return bool(title) and not any(c.isspace() for c in title)
+
+    def build(self, rows):
+        self._commands = {self._key(row[1]): row for row in rows if self._is_command(row[1])}
+        self._unknown = TTLCache(max_size=self._unknown.max_size, ttl=self._unknown.ttl)
+        self.loaded = True
+
+    def put(self, row):
+        # Заголовок мог смениться — убираем прежнюю запись этого id
+        for key, old in list(self._commands.items()):
+            if old[0] == row[0]:
+                del self._commands[key]
+        if self._is_command(row[1]):
+            self._commands[self._key(row[1])] = row
+            self._unknown.pop(self._key(row[1]))
+
+    def get(self, command: str):
+        row = self._commands.get(self._key(command))
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row
+
+    def is_unknown(self, command: str) -> bool:
+        return self._key(command) in self._unknown
+
+    def mark_unknown(self, command: str):
+        self._unknown.set(self._key(command), True)
+
+    def stats(self) -> dict:
+        return {"size": len(self._commands), "hits": self.hits, "misses": self.misses,
+                "negative": len(self._unknown)}
+
+
+command_table = CommandTable(
+    negative_cache_size=config.COMMAND_NEGATIVE_CACHE_SIZE,
+    negative_cache_ttl=config.COMMAND_NEGATIVE_CACHE_TTL
+)
+
+# Предзагрузка всех текстов в кэш (вызывается при старте бота)
+async def load_messages():
     try:
-        conn = get_mysql_conn()
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS messages (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            title VARCHAR(255) NOT NULL,
-            text TEXT NOT NULL
-        )''')
-        conn.commit()
-        conn.close()
-        logging.debug("База данных инициализирована")
+        rows = await database.fetchall("SELECT id, title, text FROM messages ORDER BY id")
+        message_cache.load(rows)
+        command_table.build(rows)
+        logging.info(f"Загружено текстов в кэш: {len(rows)}")
     except Exception as e:
-        logging.error(f"Ошибка при инициализации базы данных: {e}")
-
-# Вызов инициализации базы данных
-init_db()
+        logging.error(f"Ошибка при загрузке текстов в кэш: {e}")
 
 # Получение всех сообщений из базы данных с сортировкой по title
-def get_all_messages():
+async def get_all_messages():
     try:
-        conn = get_mysql_conn()
-        c = conn.cursor()
-        c.execute("SELECT id, title, text FROM messages ORDER BY title ASC")
-        messages = c.fetchall()
-        conn.close()
+        messages = await database.fetchall("SELECT id, title, text FROM messages ORDER BY title ASC")
         logging.debug(f"Получено сообщений из базы: {len(messages)}")
         return messages
     except Exception as e:
         logging.error(f"Ошибка при получении сообщений из базы: {e}")
         return []
 
+# Список (id, title) для меню редактора — без текстов
+async def get_message_titles():
+    if message_cache.loaded:
+        return message_cache.titles()
+    try:
+        return await database.fetchall("SELECT id, title FROM messages ORDER BY title ASC")
+    except Exception as e:
+        logging.error(f"Ошибка при получении заголовков сообщений: {e}")
+        return []
+
+# Поиск сообщения по id
+async def get_message_by_id(message_id: int):
+    cached = message_cache.get_by_id(message_id)
+    if cached:
+        return cached
+    try:
+        message = await database.fetchone("SELECT id, title, text FROM messages WHERE id = %s", (message_id,))
+        if message:
+            message_cache.put(message)
+        else:
+            logging.debug(f"Сообщение с ID {message_id} не найдено")
+        return message
+    except Exception as e:
+        logging.error(f"Ошибка при поиске сообщения с ID {message_id}: {e}")
+        return None
+
+# Ответ на /команду: из таблицы команд, без БД для неизвестных команд
+async def get_command_message(command: str):
+    if command_table.loaded:
+        return command_table.get(command)
+    if command_table.is_unknown(command):
+        return None
+    message = await get_message_by_title(command)
+    if message is None:
+        command_table.mark_unknown(command)
+    return message
+
 # Поиск сообщения по title
-def get_message_by_title(title: str):
+async def get_message_by_title(title: str):
+    cached = message_cache.get_by_title(title)
+    if cached:
+        return cached
     try:
-        conn = get_mysql_conn()
-        c = conn.cursor()
-        c.execute("SELECT id, title, text FROM messages WHERE title = %s LIMIT 1", (title,))
-        message = c.fetchone()
-        conn.close()
+        message = await database.fetchone("SELECT id, title, text FROM messages WHERE title = %s LIMIT 1", (title,))
         if message:
             logging.debug(f"Найдено сообщение с title='{title}'")
+            message_cache.put(message)
             return message
         else:
             logging.debug(f"Сообщение с title='{title}' не найдено")
@@ -56,19 +208,24 @@ def get_message_by_title(title: str):
         return None
 
 # Обновление текста сообщения в базе данных
-def update_message_text(message_id: int, new_text: str):
+async def update_message_text(message_id: int, new_text: str):
     try:
-        conn = get_mysql_conn()
-        c = conn.cursor()
-        c.execute("UPDATE messages SET text = %s WHERE id = %s", (new_text, message_id))
-        conn.commit()
-        conn.close()
+        await database.execute("UPDATE messages SET text = %s WHERE id = %s", (new_text, message_id))
         logging.debug(f"Сообщение с ID {message_id} обновлено")
     except Exception as e:
         logging.error(f"Ошибка при обновлении сообщения: {e}")
         raise
+    # Write-through: обновляем кэш из БД, чтобы не расходиться с сохранённым значением
+    message_cache.invalidate(message_id)
+    try:
+        row = await database.fetchone("SELECT id, title, text FROM messages WHERE id = %s", (message_id,))
+        if row:
+            message_cache.put(row)
+            command_table.put(row)
+    except Exception as e:
+        logging.error(f"Ошибка при обновлении кэша сообщения с ID {message_id}: {e}")
 
 def is_admin(user_id: int) -> bool:
     is_admin_user = user_id in config.ADMIN_IDS
     logging.debug(f"Проверка админа: user_id={user_id}, is_admin={is_admin_user}")
-    return is_admin_user
\ No newline at end of file
+    return is_admin_user
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import sys
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+import mysql.connector.aio
+
+from config import config
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Не удалось получить соединение из пула за отведённое время"""
+
+
+class ConnectionPool:
+    """Асинхронный пул соединений MySQL поверх mysql.connector.aio"""
+
+    def __init__(self, min_size: int, max_size: int, acquire_timeout: float,
+                 health_check_interval: float, **connect_kwargs):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self._connect_kwargs = connect_kwargs
+        self._idle = deque()  # (connection, last_used)
+        self._slots = asyncio.Semaphore(max_size)
+        self._size = 0
+        self._closed = False
+        self._stats = {
+            "acquired": 0,
+            "created": 0,
+            "discarded": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "wait_time_total": 0.0,
+        }
+
+    async def open(self):
+        """Предварительно открывает min_size соединений"""
+        conns = await asyncio.gather(
+            *(self._connect() for _ in range(self.min_size)),
+            return_exceptions=True
+        )
+        for conn in conns:
+            if isinstance(conn, Exception):
+                logger.error(f"Ошибка при открытии соединения пула: {conn}")
+                continue
+            self._idle.append((conn, time.monotonic()))
+        logger.info(f"Пул MySQL открыт: {len(self._idle)} соединений")
+
+    async def close(self):
+        self._closed = True
+        while self._idle:
+            conn, _ = self._idle.popleft()
+            await self._close_conn(conn)
+
+    async def _connect(self):
+        self._size += 1
+        try:
+            conn = await mysql.connector.aio.connect(**self._connect_kwargs)
+        except Exception:
+            self._size -= 1
+            raise
+        self._stats["created"] += 1
+        return conn
+
+    async def _close_conn(self, conn):
+        self._size -= 1
+        try:
+            await conn.close()
+        except Exception as e:
+            logger.debug(f"Ошибка при закрытии соединения: {e}")
+
+    async def _is_healthy(self, conn) -> bool:
+        try:
+            return await conn.is_connected()
+        except Exception:
+            return False
+
+    async def _checkout(self):
+        while self._idle:
+            conn, last_used = self._idle.pop()
+            if time.monotonic() - last_used < self.health_check_interval:
+                return conn
+            if await self._is_healthy(conn):
+                return conn
+            self._stats["health_check_failures"] += 1
+            self._stats["discarded"] += 1
+            await self._close_conn(conn)
+        return await self._connect()
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Выдаёт соединение из пула, возвращая его после использования"""
+        if self._closed:
+            raise RuntimeError("Пул соединений закрыт")
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise PoolTimeoutError(
+                f"Нет свободных соединений за {self.acquire_timeout} сек"
+            ) from None
+        self._stats["wait_time_total"] += time.monotonic() - started
+
+        conn = None
+        try:
+            conn = await self._checkout()
+            self._stats["acquired"] += 1
+            try:
+                yield conn
+            except BaseException:
+                # После ошибки или отмены (в т.ч. CancelledError) на соединении может
+                # остаться незавершённый запрос или непрочитанный результат —
+                # в пул возвращаем только соединения после штатного выхода
+                self._stats["discarded"] += 1
+                discarded, conn = conn, None
+                await self._close_conn(discarded)
+                raise
+        finally:
+            if conn is not None:
+                if self._closed:
+                    await self._close_conn(conn)
+                else:
+                    self._idle.append((conn, time.monotonic()))
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Текущее состояние пула"""
+        idle = len(self._idle)
+        return {
+            "size": self._size,
+            "idle": idle,
+            "in_use": self._size - idle,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            **self._stats,
+        }
+
+
+pool: ConnectionPool | None = None
+
+
+async def init_pool() -> ConnectionPool:
+    global pool
+    if pool is None:
+        pool = ConnectionPool(
+            min_size=config.MYSQL_POOL_MIN_SIZE,
+            max_size=config.MYSQL_POOL_MAX_SIZE,
+            acquire_timeout=config.MYSQL_POOL_ACQUIRE_TIMEOUT,
+            health_check_interval=config.MYSQL_POOL_HEALTH_CHECK_INTERVAL,
+            **config.MYSQL_CONFIG
+        )
+        await pool.open()
+    return pool
+
+
+async def close_pool():
+    global pool
+    if pool is not None:
+        await pool.close()
+        pool = None
+
+
+def get_pool() -> ConnectionPool:
+    if pool is None:
+        raise RuntimeError("Пул соединений не инициализирован (init_pool)")
+    return pool
+
+
+# Число запросов через хелперы модуля с момента запуска (для бенчмарков)
+query_count = 0
+
+
+def _caller() -> str:
+    # Имя функции сервиса, вызвавшей хелпер: кадр 0 — _caller, 1 — хелпер
+    return sys._getframe(2).f_code.co_name
+
+
+@contextmanager
+def _observed(function: str):
+    global query_count
+    query_count += 1
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        metrics.DB_QUERY_ERRORS.labels(function).inc()
+        raise
+    finally:
+        metrics.DB_QUERY_LATENCY.labels(function).observe(time.perf_counter() - started)
+
+
+async def execute(query: str, params: tuple = ()) -> int:
+    """Выполняет запрос и возвращает количество затронутых строк"""
+    with _observed(_caller()):
+        async with get_pool().acquire() as conn:
+            cursor = await conn.cursor(buffered=True)
+            try:
+                await cursor.execute(query, params)
+                return cursor.rowcount
+            finally:
+                await cursor.close()
+
+
+async def execute_lastrowid(query: str, params: tuple = ()) -> int:
+    """Выполняет запрос и возвращает lastrowid (0, если id не был получен)"""
+    with _observed(_caller()):
+        async with get_pool().acquire() as conn:
+            cursor = await conn.cursor(buffered=True)
+            try:
+                await cursor.execute(query, params)
+                return cursor.lastrowid or 0
+            finally:
+                await cursor.close()
+
+
+async def executemany(query: str, seq_params: list[tuple]) -> int:
+    with _observed(_caller()):
+        async with get_pool().acquire() as conn:
+            cursor = await conn.cursor(buffered=True)
+            try:
+                await cursor.executemany(query, seq_params)
+                return cursor.rowcount
+            finally:
+                await cursor.close()
+
+
+async def fetchone(query: str, params: tuple = ()):
+    with _observed(_caller()):
+        async with get_pool().acquire() as conn:
+            cursor = await conn.cursor(buffered=True)
+            try:
+                await cursor.execute(query, params)
+                return await cursor.fetchone()
+            finally:
+                await cursor.close()
+
+
+async def fetchall(query: str, params: tuple = ()) -> list:
+    with _observed(_caller()):
+        async with get_pool().acquire() as conn:
+            cursor = await conn.cursor(buffered=True)
+            try:
+                await cursor.execute(query, params)
+                return await cursor.fetchall()
+            finally:
+                await cursor.close()
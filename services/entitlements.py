@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from config import config
+from services import database
+
+logger = logging.getLogger(__name__)
+
+
+class EntitlementIndex:
+    """Индекс оплативших пользователей в памяти.
+
+    Загружается при старте, пополняется при сохранении успешного платежа
+    и периодически сверяется с таблицей payments."""
+
+    def __init__(self, reconcile_interval: int):
+        self.reconcile_interval = reconcile_interval
+        self._paid = frozenset()
+        self._granted_during_load = None
+        self._task = None
+        self.loaded = False
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._paid
+
+    def __len__(self) -> int:
+        return len(self._paid)
+
+    def grant(self, user_id: int):
+        if user_id in self._paid:
+            return
+        # Новый frozenset подменяется одной операцией присваивания
+        self._paid = self._paid | {user_id}
+        if self._granted_during_load is not None:
+            self._granted_during_load.add(user_id)
+
+    async def load(self):
+        self._granted_during_load = set()
+        try:
+            rows = await database.fetchall(
+                "SELECT DISTINCT user_id FROM payments WHERE payment_status = 'succeeded'"
+            )
+            # Доступы, выданные пока шёл запрос, не должны потеряться
+            self._paid = frozenset(row[0] for row in rows) | self._granted_during_load
+            self.loaded = True
+        finally:
+            self._granted_during_load = None
+        logger.info(f"Индекс доступа загружен: {len(self._paid)} пользователей")
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Ошибка сверки индекса доступа: {e}")
+
+    async def start(self):
+        await self.load()
+        self._task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+entitlements = EntitlementIndex(reconcile_interval=config.ENTITLEMENT_RECONCILE_INTERVAL)
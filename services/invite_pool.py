@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+
+from aiogram import Bot
+
+from config import config
+from services import database
+from services.outbound import Priority, outbound_priority
+
+logger = logging.getLogger(__name__)
+
+
+class InviteLinkPool:
+    """Пул заранее созданных одноразовых ссылок-приглашений в канал.
+
+    Фоновая задача держит в таблице invite_link_pool target_size свободных
+    ссылок, поэтому при оплате ссылка выдаётся без запроса к Telegram."""
+
+    def __init__(self, target_size: int, link_ttl: int, min_ttl: int, refill_interval: int):
+        self.target_size = target_size
+        self.link_ttl = link_ttl
+        self.min_ttl = min_ttl
+        self.refill_interval = refill_interval
+        self._refill_needed = asyncio.Event()
+        self._task = None
+        self._bot = None
+        self.available = 0
+
+    async def assign(self, user_id: int) -> str | None:
+        """Атомарно закрепляет свободную ссылку за пользователем"""
+        now = int(time.time())
+        # LAST_INSERT_ID(id) возвращает id закреплённой строки через lastrowid
+        link_id = await database.execute_lastrowid("""
+            UPDATE invite_link_pool
+            SET assigned_user_id = %s, assigned_at = %s, id = LAST_INSERT_ID(id)
+            WHERE assigned_user_id IS NULL AND expire_date > %s
+            ORDER BY id
+            LIMIT 1
+        """, (user_id, now, now + self.min_ttl))
+        link = None
+        if link_id:
+            row = await database.fetchone("SELECT invite_link FROM invite_link_pool WHERE id = %s", (link_id,))
+            link = row[0] if row else None
+
+        if link:
+            self.available = max(self.available - 1, 0)
+        if self.available < self.target_size // 2:
+            self._refill_needed.set()
+        return link
+
+    async def _count_available(self) -> int:
+        row = await database.fetchone("""
+            SELECT COUNT(*) FROM invite_link_pool
+            WHERE assigned_user_id IS NULL AND expire_date > %s
+        """, (int(time.time()) + self.min_ttl,))
+        return row[0] if row else 0
+
+    async def refill(self):
+        now = int(time.time())
+        # Свободные ссылки, которые скоро истекут, больше не выдаём
+        await database.execute("""
+            DELETE FROM invite_link_pool
+            WHERE assigned_user_id IS NULL AND expire_date <= %s
+        """, (now + self.min_ttl,))
+
+        self.available = await self._count_available()
+        for _ in range(self.target_size - self.available):
+            link = await self._bot.create_chat_invite_link(
+                chat_id=config.CHANNEL_ID,
+                name="Course access",
+                expire_date=now + self.link_ttl,
+                member_limit=1
+            )
+            await database.execute("""
+                INSERT INTO invite_link_pool (invite_link, expire_date, created_at)
+                VALUES (%s, %s, %s)
+            """, (link.invite_link, now + self.link_ttl, now))
+            self.available += 1
+
+    async def _run(self):
+        while True:
+            try:
+                # Пополнение не должно вытеснять ответы пользователям
+                with outbound_priority(Priority.LOW):
+                    await self.refill()
+            except Exception as e:
+                logger.error(f"Ошибка пополнения пула ссылок: {e}")
+            try:
+                await asyncio.wait_for(self._refill_needed.wait(), self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._refill_needed.clear()
+
+    def start(self, bot: Bot):
+        self._bot = bot
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+invite_pool = InviteLinkPool(
+    target_size=config.INVITE_POOL_SIZE,
+    link_ttl=config.INVITE_LINK_TTL,
+    min_ttl=config.INVITE_LINK_MIN_TTL,
+    refill_interval=config.INVITE_POOL_REFILL_INTERVAL
+)
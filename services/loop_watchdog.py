@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from config import config
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_HANDLERS_DIR = os.path.join(_PROJECT_ROOT, "handlers") + os.sep
+_SERVICES_DIR = os.path.join(_PROJECT_ROOT, "services") + os.sep
+
+def _describe(frame: traceback.FrameSummary) -> str:
+    return f"{os.path.relpath(frame.filename, _PROJECT_ROOT)}:{frame.lineno} {frame.name}"
+
+
+class LoopWatchdog:
+    """Находит код, удерживающий цикл событий дольше порога.
+
+    Корутина-пульс обновляет отметку времени; отдельный поток замечает,
+    что пульс пропал, снимает стек потока цикла через sys._current_frames
+    и пишет в лог хендлер и вызов сервиса, во время которых цикл стоял."""
+
+    def __init__(self, threshold: float, interval: float):
+        self.threshold = threshold
+        self.interval = interval
+        self._last_beat = time.monotonic()
+        self._loop_thread_id = None
+        self._heartbeat = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self.stalls = 0
+
+    async def _beat(self):
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        stall_started = None
+        while not self._stopped.wait(self.interval):
+            last_beat = self._last_beat
+            stalled = time.monotonic() - last_beat
+            if stalled < self.threshold:
+                if stall_started is not None:
+                    logger.warning(
+                        f"Цикл событий освободился, блокировка длилась "
+                        f"{(last_beat - stall_started) * 1000:.0f} мс"
+                    )
+                stall_started = None
+                continue
+            if stall_started is not None:
+                continue
+            stall_started = last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._report(stalled, traceback.extract_stack(frame))
+
+    def _report(self, stalled: float, stack: traceback.StackSummary):
+        self.stalls += 1
+        handler = service = None
+        # Ближайшие к месту блокировки кадры хендлеров и сервисов
+        for frame in reversed(stack):
+            if handler is None and frame.filename.startswith(_HANDLERS_DIR):
+                handler = frame
+            if service is None and frame.filename.startswith(_SERVICES_DIR) \
+                    and not frame.filename.endswith("loop_watchdog.py"):
+                service = frame
+        metrics.EVENT_LOOP_BLOCKED.labels(
+            handler.name if handler else "unknown",
+            service.name if service else "unknown"
+        ).inc()
+        logger.warning(
+            f"Цикл событий заблокирован > {stalled * 1000:.0f} мс; "
+            f"хендлер: {_describe(handler) if handler else '—'}, "
+            f"сервис: {_describe(service) if service else '—'}\n"
+            + "".join(traceback.format_list(stack[-15:]))
+        )
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Сторож цикла событий включён, порог {self.threshold * 1000:.0f} мс")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+loop_watchdog = LoopWatchdog(
+    threshold=config.LOOP_WATCHDOG_THRESHOLD,
+    interval=config.LOOP_WATCHDOG_INTERVAL
+)
@@ -0,0 +1,49 @@
+import logging
+
+from aiogram import Bot
+
+from config import config
+from services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Кортеж, а не множество: статусы aiogram — str-Enum с другим хешем
+MEMBER_STATUSES = ("member", "administrator", "creator")
+
+
+class MembershipCache:
+    """Членство пользователей в канале курса.
+
+    Поддерживается в актуальном состоянии обновлениями chat_member и
+    заявками на вступление; по истечении TTL статус перепроверяется
+    через get_chat_member."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def update(self, user_id: int, status: str):
+        self._cache.set(user_id, status in MEMBER_STATUSES)
+
+    def forget(self, user_id: int):
+        self._cache.pop(user_id)
+
+    async def is_member(self, bot: Bot, user_id: int) -> bool:
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        member = await bot.get_chat_member(config.CHANNEL_ID, user_id)
+        self.update(user_id, member.status)
+        return member.status in MEMBER_STATUSES
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, **self._cache.stats()}
+
+
+membership_cache = MembershipCache(
+    max_size=config.MEMBERSHIP_CACHE_MAX_SIZE,
+    ttl=config.MEMBERSHIP_CACHE_TTL
+)
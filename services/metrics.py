@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+HANDLER_LATENCY = Histogram(
+    "bot_handler_latency_seconds", "Время обработки обновления хендлером",
+    ["router", "event"]
+)
+HANDLER_ERRORS = Counter(
+    "bot_handler_errors_total", "Исключения в хендлерах", ["router", "event"]
+)
+DB_QUERY_LATENCY = Histogram(
+    "bot_db_query_latency_seconds", "Время запроса к MySQL по функциям сервисов",
+    ["function"], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+DB_QUERY_ERRORS = Counter(
+    "bot_db_query_errors_total", "Ошибки запросов к MySQL", ["function"]
+)
+TELEGRAM_API_LATENCY = Histogram(
+    "bot_telegram_api_latency_seconds", "Время запроса к Bot API", ["method"]
+)
+TELEGRAM_API_ERRORS = Counter(
+    "bot_telegram_api_errors_total", "Ошибки запросов к Bot API", ["method", "error"]
+)
+YOOKASSA_API_LATENCY = Histogram(
+    "bot_yookassa_api_latency_seconds", "Время запроса к API ЮKassa", ["operation"]
+)
+YOOKASSA_API_ERRORS = Counter(
+    "bot_yookassa_api_errors_total", "Ошибки запросов к API ЮKassa", ["operation"]
+)
+PENDING_PAYMENT_CHECKS = Gauge(
+    "bot_pending_payment_checks", "Платежи, ожидающие проверки статуса"
+)
+EVENT_LOOP_LAG = Gauge(
+    "bot_event_loop_lag_seconds", "Последняя измеренная задержка цикла событий"
+)
+EVENT_LOOP_LAG_HISTOGRAM = Histogram(
+    "bot_event_loop_lag_histogram_seconds", "Распределение задержки цикла событий",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "bot_event_loop_blocked_total", "Блокировки цикла событий дольше порога (сторож)",
+    ["handler", "service"]
+)
+
+
+class CacheCollector:
+    """Отдаёт счётчики кэшей, читая их в момент опроса"""
+
+    def __init__(self):
+        self._caches = {}
+
+    def watch(self, name: str, stats):
+        """stats — функция, возвращающая словарь с любыми из ключей
+        hits, misses, size, memory_bytes"""
+        self._caches[name] = stats
+
+    def collect(self):
+        hits = CounterMetricFamily("bot_cache_hits", "Попадания в кэш", labels=["cache"])
+        misses = CounterMetricFamily("bot_cache_misses", "Промахи кэша", labels=["cache"])
+        ratio = GaugeMetricFamily("bot_cache_hit_ratio", "Доля попаданий в кэш", labels=["cache"])
+        size = GaugeMetricFamily("bot_cache_size", "Количество записей в кэше", labels=["cache"])
+        memory = GaugeMetricFamily("bot_cache_memory_bytes", "Приблизительный объём кэша в байтах",
+                                   labels=["cache"])
+        for name, stats in self._caches.items():
+            try:
+                data = stats()
+            except Exception as e:
+                logger.debug(f"Не удалось получить статистику кэша {name}: {e}")
+                continue
+            if "hits" in data and "misses" in data:
+                total = data["hits"] + data["misses"]
+                hits.add_metric([name], data["hits"])
+                misses.add_metric([name], data["misses"])
+                ratio.add_metric([name], data["hits"] / total if total else 0.0)
+            if "size" in data:
+                size.add_metric([name], data["size"])
+            if "memory_bytes" in data:
+                memory.add_metric([name], data["memory_bytes"])
+        yield hits
+        yield misses
+        yield ratio
+        yield size
+        yield memory
+
+
+cache_collector = CacheCollector()
+REGISTRY.register(cache_collector)
+
+
+class LoopLagMonitor:
+    """Измеряет, насколько позже запланированного просыпается цикл событий"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started - self.interval, 0.0)
+            EVENT_LOOP_LAG.set(lag)
+            EVENT_LOOP_LAG_HISTOGRAM.observe(lag)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+loop_lag_monitor = LoopLagMonitor()
+
+
+def start_metrics_server(host: str, port: int):
+    """Отдаёт /metrics на отдельном порту (HTTP-сервер в фоновом потоке)"""
+    start_http_server(port, addr=host)
+    logger.info(f"Метрики Prometheus: http://{host}:{port}/metrics")
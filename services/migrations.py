@@ -0,0 +1,306 @@
+"""Версионные миграции схемы БД.
+
+    python -m services.migrations          # применить недостающие миграции
+    python -m services.migrations --check  # EXPLAIN горячих запросов, код 1 при полном скане
+"""
+import asyncio
+import logging
+import sys
+
+from config import config
+from services import database
+
+logger = logging.getLogger(__name__)
+
+_LOCK_NAME = "land_course_schema_migrations"
+
+
+async def _index_exists(table: str, index: str) -> bool:
+    row = await database.fetchone("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index))
+    return row is not None
+
+
+async def _create_index(table: str, index: str, ddl: str):
+    # Таблицы могли быть созданы старыми версиями бота уже с индексом
+    if not await _index_exists(table, index):
+        await database.execute(ddl)
+
+
+async def _baseline_schema():
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id BIGINT PRIMARY KEY,
+            username VARCHAR(255),
+            first_name VARCHAR(255),
+            last_name VARCHAR(255),
+            email VARCHAR(255) UNIQUE,
+            registration_date DATETIME,
+            registration_timestamp BIGINT
+        )
+    """)
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS user_consents (
+            user_id BIGINT PRIMARY KEY,
+            data_consent BOOLEAN NOT NULL,
+            offer_consent BOOLEAN NOT NULL,
+            timestamp DATETIME NOT NULL
+        )
+    """)
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS user_links (
+            user_id BIGINT PRIMARY KEY,
+            invite_link TEXT,
+            created_at BIGINT,
+            created_date DATETIME
+        )
+    """)
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS payments (
+            user_id BIGINT,
+            payment_id VARCHAR(255),
+            amount FLOAT,
+            currency VARCHAR(10),
+            payment_timestamp BIGINT,
+            payment_date DATETIME,
+            payment_method VARCHAR(50),
+            payment_status VARCHAR(50) NOT NULL,
+            PRIMARY KEY (user_id, payment_id)
+        )
+    """)
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS messages (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            title VARCHAR(255) NOT NULL,
+            text TEXT NOT NULL
+        )
+    """)
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS reviews (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            photo_url VARCHAR(255) NOT NULL UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS pending_payments (
+            payment_id VARCHAR(255) PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            chat_id BIGINT NOT NULL,
+            attempts INT NOT NULL DEFAULT 0,
+            created_at BIGINT NOT NULL,
+            next_check_at BIGINT NOT NULL
+        )
+    """)
+
+
+async def _hot_path_indexes():
+    await _create_index(
+        "payments", "idx_payments_user_status",
+        "CREATE INDEX idx_payments_user_status ON payments (user_id, payment_status)"
+    )
+    await _create_index(
+        "payments", "uq_payments_payment_id",
+        "CREATE UNIQUE INDEX uq_payments_payment_id ON payments (payment_id)"
+    )
+
+    # Дубли заголовков не удаляем, а переименовываем, оставляя исходный title за меньшим id
+    await database.execute("""
+        UPDATE messages m
+        JOIN messages m2 ON m2.title = m.title AND m2.id < m.id
+        SET m.title = CONCAT(m.title, ' #', m.id)
+    """)
+    await _create_index(
+        "messages", "uq_messages_title",
+        "CREATE UNIQUE INDEX uq_messages_title ON messages (title)"
+    )
+
+    await _create_index(
+        "reviews", "idx_reviews_created_at",
+        "CREATE INDEX idx_reviews_created_at ON reviews (created_at)"
+    )
+    await _create_index(
+        "pending_payments", "idx_pending_next_check",
+        "CREATE INDEX idx_pending_next_check ON pending_payments (next_check_at)"
+    )
+
+
+async def _broadcasts():
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            admin_id BIGINT NOT NULL,
+            text TEXT NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            total INT NOT NULL DEFAULT 0,
+            last_user_id BIGINT NOT NULL DEFAULT 0,
+            sent INT NOT NULL DEFAULT 0,
+            failed INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP NULL,
+            INDEX idx_broadcasts_status (status)
+        )
+    """)
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS broadcast_deliveries (
+            broadcast_id INT NOT NULL,
+            user_id BIGINT NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            error VARCHAR(255),
+            sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (broadcast_id, user_id)
+        )
+    """)
+
+
+async def _invite_link_pool():
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS invite_link_pool (
+            id INT PRIMARY KEY AUTO_INCREMENT,
+            invite_link VARCHAR(255) NOT NULL UNIQUE,
+            expire_date BIGINT NOT NULL,
+            created_at BIGINT NOT NULL,
+            assigned_user_id BIGINT NULL,
+            assigned_at BIGINT NULL,
+            INDEX idx_invite_pool_available (assigned_user_id, expire_date)
+        )
+    """)
+
+
+async def _drop_reviews_created_at_index():
+    # Отзывы листаются по id (keyset), индекс по created_at не используется
+    if await _index_exists("reviews", "idx_reviews_created_at"):
+        await database.execute("DROP INDEX idx_reviews_created_at ON reviews")
+
+
+# (версия, описание, функция миграции) — только добавлять в конец
+MIGRATIONS = [
+    (1, "baseline schema", _baseline_schema),
+    (2, "hot path indexes", _hot_path_indexes),
+    (3, "broadcasts", _broadcasts),
+    (4, "invite link pool", _invite_link_pool),
+    (5, "drop unused reviews created_at index", _drop_reviews_created_at_index),
+]
+
+
+async def get_schema_version() -> int:
+    row = await database.fetchone("SELECT MAX(version) FROM schema_migrations")
+    return row[0] if row and row[0] else 0
+
+
+async def run_migrations():
+    """Применяет недостающие миграции под именованной блокировкой MySQL"""
+    await database.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Блокировка живёт в сессии, поэтому держим отдельное соединение до конца
+    async with database.get_pool().acquire() as lock_conn:
+        cursor = await lock_conn.cursor(buffered=True)
+        try:
+            await cursor.execute("SELECT GET_LOCK(%s, 60)", (_LOCK_NAME,))
+            locked = await cursor.fetchone()
+            if not locked or locked[0] != 1:
+                raise RuntimeError("Не удалось получить блокировку миграций")
+            try:
+                current = await get_schema_version()
+                for version, description, migrate in MIGRATIONS:
+                    if version <= current:
+                        continue
+                    logger.info(f"Миграция {version}: {description}")
+                    await migrate()
+                    await database.execute(
+                        "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                        (version, description)
+                    )
+            finally:
+                await cursor.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+                await cursor.fetchone()
+        finally:
+            await cursor.close()
+
+
+# Запросы горячих путей для проверки планов выполнения:
+# (название, запрос, параметры, допустим ли полный проход по индексу).
+# Проход по индексу допускается только для ORDER BY ... LIMIT без WHERE —
+# MySQL читает лишь LIMIT строк с края индекса.
+HOT_QUERIES = [
+    ("has_payment",
+     "SELECT 1 FROM payments WHERE user_id = %s AND payment_status = 'succeeded' LIMIT 1", (1,), False),
+    ("payment_by_id",
+     "SELECT user_id, payment_status FROM payments WHERE payment_id = %s", ("x",), False),
+    ("get_message_by_title",
+     "SELECT id, title, text FROM messages WHERE title = %s LIMIT 1", ("x",), False),
+    ("get_message_by_id",
+     "SELECT id, title, text FROM messages WHERE id = %s", (1,), False),
+    ("get_reviews_page",
+     "SELECT id, photo_url FROM reviews WHERE id < %s ORDER BY id DESC LIMIT 11", (1000,), False),
+    ("get_album",
+     "SELECT id, photo_url FROM reviews ORDER BY id DESC LIMIT 11", (), True),
+    ("get_user_email",
+     "SELECT email FROM users WHERE user_id = %s", (1,), False),
+    ("get_user_invite_link",
+     "SELECT invite_link FROM user_links WHERE user_id = %s", (1,), False),
+    ("pending_payments_due",
+     "SELECT payment_id FROM pending_payments WHERE next_check_at <= %s ORDER BY next_check_at LIMIT 50", (0,), False),
+]
+
+
+async def explain_hot_queries(min_rows: int = None) -> list[str]:
+    """Возвращает горячие запросы с полным сканом таблицы или индекса либо filesort.
+
+    Таблицы, где MySQL оценивает меньше min_rows строк, пропускаются: на маленьких
+    таблицах полный скан дешевле индекса, и оптимизатор выбирает его сам."""
+    if min_rows is None:
+        min_rows = config.PLAN_CHECK_MIN_ROWS
+    problems = []
+    for name, query, params, index_scan_allowed in HOT_QUERIES:
+        for row in await database.fetchall(f"EXPLAIN {query}", params):
+            # Колонки EXPLAIN: id, select_type, table, partitions, type, possible_keys, key,
+            # key_len, ref, rows, filtered, Extra
+            table, access_type, rows, extra = row[2], row[4], row[9] or 0, row[11] or ""
+            if rows < min_rows:
+                continue
+            if access_type == "ALL":
+                problems.append(f"{name}: полный скан таблицы {table}")
+            elif access_type == "index" and not index_scan_allowed:
+                problems.append(f"{name}: полный проход по индексу {row[6]} таблицы {table}")
+            if "Using filesort" in extra:
+                problems.append(f"{name}: сортировка без индекса (filesort) в {table}")
+    return problems
+
+
+async def check_hot_queries():
+    """Проверка планов при запуске: проблемы пишутся в лог, запуск не прерывается"""
+    problems = await explain_hot_queries()
+    for problem in problems:
+        logger.error(f"План горячего запроса: {problem}")
+    if not problems:
+        logger.info("Планы горячих запросов в порядке")
+
+
+async def _main(check: bool) -> int:
+    await database.init_pool()
+    try:
+        await run_migrations()
+        print(f"Версия схемы: {await get_schema_version()}")
+        if check:
+            problems = await explain_hot_queries()
+            for problem in problems:
+                print(problem)
+            return 1 if problems else 0
+        return 0
+    finally:
+        await database.close_pool()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main("--check" in sys.argv)))
@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Как часто (сек) удалять корзины простаивающих чатов
+CHAT_PRUNE_INTERVAL = 60.0
+
+
+class Priority(IntEnum):
+    """Приоритет исходящего сообщения: меньше — важнее"""
+    HIGH = 0    # подтверждение оплаты, ссылки-приглашения
+    NORMAL = 1  # навигация по меню
+    LOW = 2     # массовые рассылки
+
+
+_current_priority = ContextVar("outbound_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def outbound_priority(priority: Priority):
+    """Задаёт приоритет всех запросов к Bot API внутри блока"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Сколько ждать до появления токена"""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.paused_until - now)
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.paused_until <= now
+
+
+class OutboundScheduler:
+    """Глобальный планировщик исходящих сообщений.
+
+    Соблюдает общий лимит бота и лимит на чат (token bucket), а из ожидающих
+    запросов первым пропускает самый приоритетный, чей чат готов к отправке."""
+
+    def __init__(self, global_rate: float, chat_rate: float, chat_burst: int, group_rate: float):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self._chats = {}
+        self._queue = []  # (priority, seq, chat_id, future)
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._pump_task = None
+        self._last_prune = time.monotonic()
+        self.stats = {"sent": 0, "waited": 0, "retry_after": 0, "wait_time_total": 0.0}
+
+    def chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Отрицательные id — группы и каналы, у них лимит в минуту
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = self.group_rate if is_group else self.chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, self.chat_burst)
+        return bucket
+
+    def queue_size(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self, chat_id, priority: Priority):
+        """Ждёт разрешения на отправку в чат"""
+        now = time.monotonic()
+        if not self._queue and self.global_bucket.delay(now) == 0 and self.chat_bucket(chat_id).delay(now) == 0:
+            self._grant(chat_id, now)
+            return
+
+        started = now
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), chat_id, future))
+        self.stats["waited"] += 1
+        self._ensure_pump()
+        self._wakeup.set()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        self.stats["wait_time_total"] += time.monotonic() - started
+
+    def _grant(self, chat_id, now: float):
+        # Быстрый путь не запускает _pump, поэтому чистим корзины и здесь
+        if now - self._last_prune >= CHAT_PRUNE_INTERVAL:
+            self._prune_chats()
+        self.global_bucket.consume(now)
+        self.chat_bucket(chat_id).consume(now)
+        self.stats["sent"] += 1
+
+    def _ensure_pump(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+
+    async def _pump(self):
+        while True:
+            self._wakeup.clear()
+            # Отменённые ожидания выбрасываем
+            self._queue = [entry for entry in self._queue if not entry[3].done()]
+            heapq.heapify(self._queue)
+            if not self._queue:
+                self._prune_chats()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), 60)
+                except asyncio.TimeoutError:
+                    return
+                continue
+
+            now = time.monotonic()
+            wait = self.global_bucket.delay(now)
+            if wait == 0:
+                ready = None
+                wait = float("inf")
+                for entry in sorted(self._queue):
+                    chat_wait = self.chat_bucket(entry[2]).delay(now)
+                    if chat_wait == 0:
+                        ready = entry
+                        break
+                    wait = min(wait, chat_wait)
+                if ready is not None:
+                    self._queue.remove(ready)
+                    heapq.heapify(self._queue)
+                    self._grant(ready[2], now)
+                    ready[3].set_result(None)
+                    continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _prune_chats(self):
+        now = time.monotonic()
+        self._last_prune = now
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items() if bucket.idle(now)]:
+            del self._chats[chat_id]
+
+    def retry_after(self, chat_id, seconds: float):
+        """Учитывает ответ 429 от Telegram"""
+        self.stats["retry_after"] += 1
+        if chat_id is None:
+            self.global_bucket.pause(seconds)
+        else:
+            self.chat_bucket(chat_id).pause(seconds)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+
+outbound_scheduler = OutboundScheduler(
+    global_rate=config.OUTBOUND_GLOBAL_RATE,
+    chat_rate=config.OUTBOUND_CHAT_RATE,
+    chat_burst=config.OUTBOUND_CHAT_BURST,
+    group_rate=config.OUTBOUND_GROUP_RATE
+)
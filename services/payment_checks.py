@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+
+from aiogram import Bot
+
+from config import config
+from services import database
+from services.access import confirm_payment
+from services.purchasing import get_payment_status
+from services.yookassa_client import yookassa_client
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentCheckScheduler:
+    """Единый планировщик проверки статусов платежей ЮKassa.
+
+    Ожидающие платежи хранятся в таблице pending_payments, поэтому проверки
+    переживают перезапуск бота. Интервал между проверками растёт с числом попыток."""
+
+    def __init__(self, delays: list[int], timeout: int, batch_size: int, concurrency: int):
+        self.delays = delays or [10]
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wakeup = asyncio.Event()
+        self._next_due = None
+        self._task = None
+        self._bot = None
+        self.pending = 0
+
+    def _delay(self, attempts: int) -> int:
+        return self.delays[min(attempts, len(self.delays) - 1)]
+
+    def _schedule(self, due: int):
+        if self._next_due is None or due < self._next_due:
+            self._next_due = due
+            self._wakeup.set()
+
+    async def add(self, payment_id: str, user_id: int, chat_id: int):
+        now = int(time.time())
+        due = now + self._delay(0)
+        affected = await database.execute("""
+            INSERT INTO pending_payments
+            (payment_id, user_id, chat_id, attempts, created_at, next_check_at)
+            VALUES (%s, %s, %s, 0, %s, %s)
+            ON DUPLICATE KEY UPDATE next_check_at=VALUES(next_check_at)
+        """, (payment_id, user_id, chat_id, now, due))
+        # rowcount 1 — новая строка, 2 или 0 — обновление уже ожидающего платежа
+        if affected == 1:
+            self.pending += 1
+        self._schedule(due)
+
+    async def remove(self, payment_id: str):
+        """Снимает платёж с проверки, если его итог уже известен (например, из вебхука)"""
+        deleted = await database.execute("DELETE FROM pending_payments WHERE payment_id = %s", (payment_id,))
+        if deleted:
+            self.pending = max(self.pending - 1, 0)
+
+    async def start(self, bot: Bot):
+        self._bot = bot
+        row = await database.fetchone("SELECT COUNT(*), MIN(next_check_at) FROM pending_payments")
+        self.pending = row[0] if row else 0
+        if self.pending:
+            logger.info(f"Возобновлена проверка платежей: {self.pending}")
+            self._schedule(row[1])
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                if self._next_due is None:
+                    await self._wakeup.wait()
+                else:
+                    delay = self._next_due - time.time()
+                    if delay > 0:
+                        try:
+                            await asyncio.wait_for(self._wakeup.wait(), delay)
+                        except asyncio.TimeoutError:
+                            pass
+                self._wakeup.clear()
+                if self._next_due is not None and self._next_due <= time.time():
+                    await self._process_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка планировщика проверки платежей: {e}")
+                await asyncio.sleep(self._delay(0))
+
+    async def _process_due(self):
+        now = int(time.time())
+        rows = await database.fetchall("""
+            SELECT payment_id, user_id, chat_id, attempts, created_at
+            FROM pending_payments
+            WHERE next_check_at <= %s
+            ORDER BY next_check_at
+            LIMIT %s
+        """, (now, self.batch_size))
+        await asyncio.gather(*(self._check(*row) for row in rows))
+
+        row = await database.fetchone("SELECT MIN(next_check_at) FROM pending_payments")
+        self._next_due = row[0] if row else None
+
+    async def _check(self, payment_id: str, user_id: int, chat_id: int, attempts: int, created_at: int):
+        async with self._semaphore:
+            try:
+                # Итог платежа уже сохранён вебхуком ЮKassa или кнопкой проверки
+                if await get_payment_status(user_id, payment_id) in ("succeeded", "canceled"):
+                    await self.remove(payment_id)
+                    return
+
+                payment = await yookassa_client.find_payment(payment_id)
+                if payment.status == "succeeded":
+                    await confirm_payment(self._bot, user_id, payment)
+                    await self.remove(payment_id)
+                    return
+                if payment.status in ["canceled", "refunded"]:
+                    await self.remove(payment_id)
+                    await self._bot.send_message(chat_id, "❌ Платеж отменен.")
+                    return
+            except Exception as e:
+                logging.error(f"Ошибка проверки: {e}")
+
+            now = int(time.time())
+            if now - created_at >= self.timeout:
+                await self.remove(payment_id)
+                await self._bot.send_message(chat_id, "Время проверки истекло. Проверьте статус вручную.")
+                return
+
+            await database.execute("""
+                UPDATE pending_payments SET attempts = %s, next_check_at = %s
+                WHERE payment_id = %s
+            """, (attempts + 1, now + self._delay(attempts + 1), payment_id))
+
+
+payment_scheduler = PaymentCheckScheduler(
+    delays=config.PAYMENT_CHECK_DELAYS,
+    timeout=config.PAYMENT_CHECK_TIMEOUT,
+    batch_size=config.PAYMENT_CHECK_BATCH_SIZE,
+    concurrency=config.PAYMENT_CHECK_CONCURRENCY
+)
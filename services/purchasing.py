@@ -1,181 +1,157 @@
 from datetime import datetime
 import time
-import mysql.connector
-from aiogram import types
 import logging
 
-from config import config
+from services import database
+from services.entitlements import entitlements
 
 logger = logging.getLogger(__name__)
 
-def get_mysql_conn():
-    return mysql.connector.connect(**config.MYSQL_CONFIG)
-
-def init_db():
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        user_id BIGINT PRIMARY KEY,
-        username VARCHAR(255),
-        first_name VARCHAR(255),
-        last_name VARCHAR(255),
-        email VARCHAR(255) UNIQUE,
-        registration_date DATETIME,
-        registration_timestamp BIGINT
-    )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_consents (
-            user_id BIGINT PRIMARY KEY,
-            data_consent BOOLEAN NOT NULL,
-            offer_consent BOOLEAN NOT NULL,
-            timestamp DATETIME NOT NULL
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_links (
-            user_id BIGINT PRIMARY KEY,
-            invite_link TEXT,
-            created_at BIGINT,
-            created_date DATETIME
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS payments (
-            user_id BIGINT,
-            payment_id VARCHAR(255),
-            amount FLOAT,
-            currency VARCHAR(10),
-            payment_timestamp BIGINT,
-            payment_date DATETIME,
-            payment_method VARCHAR(50),
-            payment_status VARCHAR(50) NOT NULL,
-            PRIMARY KEY (user_id, payment_id)
-        )
-    """)
-    conn.close()
-
-init_db()
-
-def save_or_update_user(user_id: int, username: str = None, first_name: str = None, 
-                       last_name: str = None, email: str = None):
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
-    current_time = int(time.time())
-    current_date = datetime.fromtimestamp(current_time).strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute("SELECT 1 FROM users WHERE user_id = %s", (user_id,))
-    user_exists = cursor.fetchone() is not None
-    if user_exists:
-        cursor.execute("""
-        UPDATE users SET
-            username = COALESCE(%s, username),
-            first_name = COALESCE(%s, first_name),
-            last_name = COALESCE(%s, last_name),
-            email = COALESCE(%s, email)
-        WHERE user_id = %s
-        """, (username, first_name, last_name, email, user_id))
-    else:
-        cursor.execute("""
-        INSERT INTO users 
-        (user_id, username, first_name, last_name, email, registration_date, registration_timestamp) 
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (
-            user_id, 
-            username, 
-            first_name, 
-            last_name, 
+_UPSERT_USERS_SQL = """
+    INSERT INTO users
+    (user_id, username, first_name, last_name, email, registration_date, registration_timestamp)
+    VALUES {values}
+    ON DUPLICATE KEY UPDATE
+        username = COALESCE(VALUES(username), username),
+        first_name = COALESCE(VALUES(first_name), first_name),
+        last_name = COALESCE(VALUES(last_name), last_name),
+        email = COALESCE(VALUES(email), email)
+"""
+
+async def save_or_update_users(users: list[tuple]):
+    """Одним запросом добавляет или обновляет пользователей.
+
+    users — кортежи (user_id, username, first_name, last_name, email, registration_timestamp)"""
+    if not users:
+        return
+    params = []
+    for user_id, username, first_name, last_name, email, registration_timestamp in users:
+        params.extend((
+            user_id,
+            username,
+            first_name,
+            last_name,
             email,
-            current_date,
-            current_time
+            datetime.fromtimestamp(registration_timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+            registration_timestamp
         ))
-    conn.close()
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(users))
+    await database.execute(_UPSERT_USERS_SQL.format(values=values), tuple(params))
+
+async def save_or_update_user(user_id: int, username: str = None, first_name: str = None,
+                       last_name: str = None, email: str = None):
+    await save_or_update_users([(user_id, username, first_name, last_name, email, int(time.time()))])
 
-def save_consent(user_id: int, data_consent: bool, offer_consent: bool):
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
+async def save_consent(user_id: int, data_consent: bool, offer_consent: bool):
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute("""
+    await database.execute("""
         INSERT INTO user_consents (user_id, data_consent, offer_consent, timestamp)
         VALUES (%s, %s, %s, %s)
         ON DUPLICATE KEY UPDATE data_consent=VALUES(data_consent), offer_consent=VALUES(offer_consent), timestamp=VALUES(timestamp)
     """, (user_id, data_consent, offer_consent, timestamp))
-    conn.close()
-
-def check_consent(user_id: int):
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
-    cursor.execute('SELECT data_consent, offer_consent FROM user_consents WHERE user_id = %s', (user_id,))
-    result = cursor.fetchone()
-    conn.close()
+
+async def check_consent(user_id: int):
+    result = await database.fetchone('SELECT data_consent, offer_consent FROM user_consents WHERE user_id = %s', (user_id,))
     return result if result else (False, False)
 
-def save_yookassa_payment(user_id: int, payment):
-    """Сохраняет детальную информацию о платеже"""
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
+def _payment_params(user_id: int, payment) -> tuple:
     payment_timestamp = int(time.time())
-    amount = float(payment.amount.value)
-    
+    payment_method_type = 'unknown'
+    if payment.payment_method:
+        payment_method_type = payment.payment_method.type
+    return (
+        user_id,
+        payment.id,
+        float(payment.amount.value),
+        payment.amount.currency,
+        datetime.fromtimestamp(payment_timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+        payment_timestamp,
+        payment_method_type,
+        payment.status
+    )
+
+async def save_yookassa_payment(user_id: int, payment):
+    """Сохраняет детальную информацию о платеже"""
     try:
-        payment_method_type = 'unknown'
-        if payment.payment_method:
-            payment_method_type = payment.payment_method.type
-
-        cursor.execute("""
-            INSERT INTO payments 
-            (user_id, payment_id, amount, currency, payment_date, 
-             payment_timestamp, payment_method, payment_status) 
+        await database.execute("""
+            INSERT INTO payments
+            (user_id, payment_id, amount, currency, payment_date,
+             payment_timestamp, payment_method, payment_status)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE 
+            ON DUPLICATE KEY UPDATE
                 payment_status=VALUES(payment_status),
                 payment_method=VALUES(payment_method),
                 amount=VALUES(amount),
                 payment_timestamp=VALUES(payment_timestamp),
                 payment_date=VALUES(payment_date)
-        """, (
-            user_id, 
-            payment.id, 
-            amount,
-            payment.amount.currency,
-            datetime.fromtimestamp(payment_timestamp).strftime('%Y-%m-%d %H:%M:%S'),
-            payment_timestamp,
-            payment_method_type,
-            payment.status
-        ))
-        conn.commit()
-        
+        """, _payment_params(user_id, payment))
+
     except Exception as e:
         logger.error(f"Error saving payment: {e}")
         raise
-    finally:
-        conn.close()
-
-def has_payment(user_id: int) -> bool:
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT 1 FROM payments 
-        WHERE user_id = %s 
+
+    if payment.status == 'succeeded':
+        entitlements.grant(user_id)
+
+async def claim_succeeded_payment(user_id: int, payment) -> bool:
+    """Сохраняет успешный платёж, если он ещё не был сохранён как успешный.
+
+    Возвращает True только тому вызову, который перевёл платёж в succeeded:
+    каждый запрос атомарен, поэтому вебхук, автопроверка и кнопка не выдадут
+    доступ дважды — в том числе после перезапуска бота."""
+    params = _payment_params(user_id, payment)
+    try:
+        updated = await database.execute("""
+            UPDATE payments
+            SET amount = %s, currency = %s, payment_date = %s, payment_timestamp = %s,
+                payment_method = %s, payment_status = 'succeeded'
+            WHERE user_id = %s AND payment_id = %s AND payment_status <> 'succeeded'
+        """, params[2:7] + (user_id, payment.id))
+        claimed = updated > 0
+        if not claimed:
+            # Строки ещё нет — вставка пройдёт только у одного из конкурентов
+            claimed = await database.execute("""
+                INSERT IGNORE INTO payments
+                (user_id, payment_id, amount, currency, payment_date,
+                 payment_timestamp, payment_method, payment_status)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, 'succeeded')
+            """, params[:7]) > 0
+    except Exception as e:
+        logger.error(f"Error saving payment: {e}")
+        raise
+
+    if claimed:
+        entitlements.grant(user_id)
+    return claimed
+
+async def get_payment_status(user_id: int, payment_id: str) -> str:
+    result = await database.fetchone(
+        "SELECT payment_status FROM payments WHERE user_id = %s AND payment_id = %s",
+        (user_id, payment_id)
+    )
+    return result[0] if result else None
+
+async def has_payment(user_id: int) -> bool:
+    # После загрузки индекса проверка доступа не обращается к БД
+    if entitlements.loaded:
+        return user_id in entitlements
+    result = await database.fetchone("""
+        SELECT 1 FROM payments
+        WHERE user_id = %s
         AND payment_status = 'succeeded'
         LIMIT 1
     """, (user_id,))
-    result = cursor.fetchone() is not None
-    conn.close()
-    return result
+    return result is not None
 
-def save_invite_link(user_id: int, invite_link: str):
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
+async def save_invite_link(user_id: int, invite_link: str):
     current_time = int(time.time())
     current_date = datetime.fromtimestamp(current_time).strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute("""
-        INSERT INTO user_links 
-        (user_id, invite_link, created_at, created_date) 
+    await database.execute("""
+        INSERT INTO user_links
+        (user_id, invite_link, created_at, created_date)
         VALUES (%s, %s, %s, %s)
         ON DUPLICATE KEY UPDATE invite_link=VALUES(invite_link), created_at=VALUES(created_at), created_date=VALUES(created_date)
     """, (user_id, invite_link, current_time, current_date))
-    conn.close()
 
 def validate_email(email: str) -> bool:
     if not email or '@' not in email:
@@ -185,40 +161,16 @@ def validate_email(email: str) -> bool:
         return False
     return '.' in parts[1] and len(parts[1].split('.')[-1]) >= 2
 
-def get_user_email(user_id: int) -> str:
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
-    cursor.execute("SELECT email FROM users WHERE user_id = %s", (user_id,))
-    result = cursor.fetchone()
-    conn.close()
+async def get_user_email(user_id: int) -> str:
+    result = await database.fetchone("SELECT email FROM users WHERE user_id = %s", (user_id,))
     return result[0] if result else None
 
-def save_user_email(user_id: int, email: str):
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
+async def save_user_email(user_id: int, email: str):
     try:
-        cursor.execute("""
-        UPDATE users SET email = %s
-        WHERE user_id = %s
-        """, (email, user_id))
-        if cursor.rowcount == 0:
-            cursor.execute("""
-            INSERT INTO users (user_id, email, registration_date, registration_timestamp)
-            VALUES (%s, %s, %s, %s)
-            """, (
-                user_id, email,
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                int(time.time())
-            ))
+        await save_or_update_user(user_id, email=email)
     except Exception as e:
-        print(f"Ошибка при сохранении email: {e}")
-    finally:
-        conn.close()
-
-def get_user_invite_link(user_id: int) -> str:
-    conn = get_mysql_conn()
-    cursor = conn.cursor()
-    cursor.execute("SELECT invite_link FROM user_links WHERE user_id = %s", (user_id,))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result and result[0] else None
\ No newline at end of file
+        logger.error(f"Ошибка при сохранении email: {e}")
+
+async def get_user_invite_link(user_id: int) -> str:
+    result = await database.fetchone("SELECT invite_link FROM user_links WHERE user_id = %s", (user_id,))
+    return result[0] if result and result[0] else None
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+
+from config import config
+from services.purchasing import save_or_update_users
+
+logger = logging.getLogger(__name__)
+
+
+class RegistrationBuffer:
+    """Буфер отложенной записи пользователей из /start.
+
+    Записи копятся в памяти (повторы одного user_id схлопываются) и
+    сбрасываются многострочным upsert раз в flush_interval секунд
+    или при накоплении batch_size пользователей."""
+
+    def __init__(self, flush_interval: float, batch_size: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = {}
+        self._full = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task = None
+        self.flushed = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, user_id: int, username: str = None, first_name: str = None,
+               last_name: str = None, email: str = None):
+        previous = self._pending.get(user_id)
+        registered_at = previous[5] if previous else int(time.time())
+        self._pending[user_id] = (user_id, username, first_name, last_name, email, registered_at)
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+
+    async def flush(self):
+        while self._pending:
+            batch = list(self._pending.values())[:self.batch_size]
+            for row in batch:
+                del self._pending[row[0]]
+            try:
+                await save_or_update_users(batch)
+                self.flushed += len(batch)
+            except BaseException as e:
+                logger.error(f"Ошибка записи пользователей ({len(batch)}): {e!r}")
+                # Возвращаем в буфер (в т.ч. при отмене), не затирая более свежие данные
+                for row in batch:
+                    self._pending.setdefault(row[0], row)
+                raise
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                await asyncio.sleep(self.flush_interval)
+
+    def start(self):
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            # Не отменяем задачу: начатая запись должна завершиться
+            self._stopping.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.error(f"Не записано пользователей при остановке: {len(self._pending)}")
+
+
+registration_buffer = RegistrationBuffer(
+    flush_interval=config.REGISTRATION_FLUSH_INTERVAL,
+    batch_size=config.REGISTRATION_BATCH_SIZE
+)
@@ -1,44 +1,27 @@
 import mysql.connector
 import logging
-from config import config
+from aiogram.types import InputMediaPhoto
+from services import database
 
 logger = logging.getLogger(__name__)
 
-def get_mysql_conn():
-    return mysql.connector.connect(**config.MYSQL_CONFIG)
+# Максимум фото в одном media group Telegram
+ALBUM_SIZE = 10
 
 class ReviewService:
     def __init__(self):
-        self._init_db()
-
-    def _init_db(self):
-        """Инициализация базы данных"""
-        try:
-            conn = get_mysql_conn()
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS reviews (
-                    id INT PRIMARY KEY AUTO_INCREMENT,
-                    photo_url VARCHAR(255) NOT NULL UNIQUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.error(f"Database init error: {e}")
+        self._album = None
+        self.album_hits = 0
+        self.album_misses = 0
 
     async def add_review(self, photo_url: str) -> bool:
         """Добавление отзыва"""
         try:
-            conn = get_mysql_conn()
-            cursor = conn.cursor()
-            cursor.execute(
+            await database.execute(
                 "INSERT INTO reviews (photo_url) VALUES (%s)",
                 (photo_url,)
             )
-            conn.commit()
-            conn.close()
+            self._album = None
             return True
         except mysql.connector.errors.IntegrityError:
             logger.warning(f"Duplicate photo: {photo_url}")
@@ -50,46 +33,81 @@ class ReviewService:
     async def get_all_reviews(self) -> list[str]:
         """Получение всех отзывов"""
         try:
-            conn = get_mysql_conn()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT photo_url FROM reviews ORDER BY created_at DESC"
+            rows = await database.fetchall(
+                "SELECT photo_url FROM reviews ORDER BY id DESC"
             )
-            result = [row[0] for row in cursor.fetchall()]
-            conn.close()
-            return result
+            return [row[0] for row in rows]
         except Exception as e:
             logger.error(f"Get reviews error: {e}")
             return []
     
-    async def get_reviews_for_deletion(self) -> list[tuple[int, str]]:
-        """Получение ID и URL отзывов для удаления"""
+    async def get_album(self) -> tuple[list[InputMediaPhoto], int | None]:
+        """Альбом последних отзывов для показа пользователю и курсор следующей страницы.
+
+        Собирается один раз и сбрасывается при добавлении/удалении отзывов."""
+        if self._album is not None:
+            self.album_hits += 1
+            return self._album
+        self.album_misses += 1
+        reviews, has_older, _ = await self.get_reviews_page()
+        album = [InputMediaPhoto(media=photo_url) for _, photo_url in reviews]
+        self._album = (album, reviews[-1][0] if has_older else None)
+        return self._album
+
+    def album_stats(self) -> dict:
+        return {"hits": self.album_hits, "misses": self.album_misses}
+
+    async def get_reviews_page(self, cursor: int | None = None, newer: bool = False,
+                               limit: int = ALBUM_SIZE) -> tuple[list[tuple[int, str]], bool, bool]:
+        """Страница отзывов (новые сверху) с keyset-пагинацией по id.
+
+        cursor — id крайнего отзыва предыдущей страницы, newer — листать к более новым.
+        Возвращает (отзывы, есть_старше, есть_новее)."""
         try:
-            conn = get_mysql_conn()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, photo_url FROM reviews ORDER BY id DESC LIMIT 50"
-            )
-            result = cursor.fetchall()
-            conn.close()
-            return [(row[0], row[1]) for row in result]
+            if cursor is None:
+                rows = await database.fetchall(
+                    "SELECT id, photo_url FROM reviews ORDER BY id DESC LIMIT %s",
+                    (limit + 1,)
+                )
+            elif newer:
+                rows = await database.fetchall(
+                    "SELECT id, photo_url FROM reviews WHERE id > %s ORDER BY id ASC LIMIT %s",
+                    (cursor, limit + 1)
+                )
+            else:
+                rows = await database.fetchall(
+                    "SELECT id, photo_url FROM reviews WHERE id < %s ORDER BY id DESC LIMIT %s",
+                    (cursor, limit + 1)
+                )
         except Exception as e:
-            logger.error(f"Error getting reviews for deletion: {e}")
-            return []
+            logger.error(f"Error getting reviews page: {e}")
+            return [], False, False
+
+        has_more = len(rows) > limit
+        reviews = [(row[0], row[1]) for row in rows[:limit]]
+        if newer:
+            reviews.reverse()
+            return reviews, True, has_more
+        return reviews, has_more, cursor is not None
+
+    async def count_reviews(self) -> int:
+        """Общее количество отзывов"""
+        try:
+            row = await database.fetchone("SELECT COUNT(*) FROM reviews")
+            return row[0] if row else 0
+        except Exception as e:
+            logger.error(f"Error counting reviews: {e}")
+            return 0
 
     async def delete_review(self, review_id: int) -> bool:
         """Удаление отзыва по ID"""
         try:
-            conn = get_mysql_conn()
-            cursor = conn.cursor()
-            cursor.execute(
+            deleted = await database.execute(
                 "DELETE FROM reviews WHERE id = %s",
                 (review_id,)
             )
-            conn.commit()
-            deleted = cursor.rowcount > 0
-            conn.close()
-            return deleted
+            self._album = None
+            return deleted > 0
         except Exception as e:
             logger.error(f"Error deleting review: {e}")
             return False
@@ -97,14 +115,10 @@ class ReviewService:
     async def get_photo_url(self, review_id: int) -> str | None:
         """Получить URL фото по ID отзыва"""
         try:
-            conn = get_mysql_conn()
-            cursor = conn.cursor()
-            cursor.execute(
+            result = await database.fetchone(
                 "SELECT photo_url FROM reviews WHERE id = %s",
                 (review_id,)
             )
-            result = cursor.fetchone()
-            conn.close()
             return result[0] if result else None
         except Exception as e:
             logger.error(f"Error getting photo URL: {e}")
@@ -113,11 +127,8 @@ class ReviewService:
     async def delete_review_and_reset_ids(self, review_id: int) -> bool:
         """Удаление отзыва с перенумерацией оставшихся (MySQL: просто удаляем)"""
         try:
-            conn = get_mysql_conn()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM reviews WHERE id = %s", (review_id,))
-            conn.commit()
-            conn.close()
+            await database.execute("DELETE FROM reviews WHERE id = %s", (review_id,))
+            self._album = None
             return True
         except Exception as e:
             logger.error(f"Error in delete_and_reset: {e}")
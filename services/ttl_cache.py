@@ -0,0 +1,71 @@
+import sys
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Ограниченное по размеру хранилище с истечением записей по времени.
+
+    При переполнении вытесняются самые давние записи."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            return default
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        self._prune()
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def _prune(self):
+        now = time.monotonic()
+        # Записи упорядочены по времени установки, поэтому истёкшие — в начале
+        while self._data:
+            key, (_, expires_at) = next(iter(self._data.items()))
+            if expires_at > now:
+                break
+            del self._data[key]
+            self.expirations += 1
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def memory_usage(self) -> int:
+        """Приблизительный объём памяти в байтах"""
+        total = sys.getsizeof(self._data)
+        for key, (value, _) in self._data.items():
+            total += sys.getsizeof(key) + sys.getsizeof(value)
+        return total
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "memory_bytes": self.memory_usage(),
+        }
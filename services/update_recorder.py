@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import secrets
+import time
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+# Поля с персональными данными, которые не нужны для воспроизведения
+_DROPPED_FIELDS = frozenset({
+    "username", "last_name", "phone_number", "contact", "location", "venue",
+    "bio", "language_code", "is_premium", "invite_link",
+})
+# Поля с идентификаторами пользователей вне объектов user/chat
+_USER_ID_FIELDS = frozenset({"user_chat_id", "chat_id", "user_id"})
+
+
+class UpdateRecorder:
+    """Запись входящих обновлений в append-only JSONL для воспроизведения.
+
+    Идентификаторы пользователей заменяются HMAC-псевдонимами (стабильными
+    при одной соли), имена и прочие персональные поля удаляются, тексты
+    кроме команд и email-адресов заменяются заглушкой той же длины.
+    Строка лога: {"t": unix-время получения, "update": обновление}."""
+
+    def __init__(self, path: str, salt: str, flush_interval: float):
+        self.path = path
+        self._salt = (salt or secrets.token_hex(16)).encode()
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._task = None
+        self.recorded = 0
+
+    def _pseudonym(self, value: int) -> int:
+        # Группы и каналы (отрицательные id) не персональны — оставляем как есть
+        if value <= 0:
+            return value
+        digest = hmac.new(self._salt, str(value).encode(), hashlib.sha256).digest()
+        return int.from_bytes(digest[:6], "big")
+
+    def _text(self, text: str) -> str:
+        if text.startswith("/"):
+            return text.split()[0]
+        if _EMAIL_RE.match(text.strip()):
+            digest = hmac.new(self._salt, text.strip().lower().encode(), hashlib.sha256).hexdigest()
+            return f"user{digest[:10]}@example.com"
+        return "x" * len(text)
+
+    def anonymize(self, value):
+        if isinstance(value, dict):
+            result = {}
+            for k, v in value.items():
+                if k in _DROPPED_FIELDS:
+                    continue
+                if k == "id" and isinstance(v, int):
+                    result[k] = self._pseudonym(v)
+                elif k in _USER_ID_FIELDS and isinstance(v, int):
+                    result[k] = self._pseudonym(v)
+                elif k == "first_name":
+                    result[k] = "User"
+                elif k in ("text", "caption") and isinstance(v, str):
+                    result[k] = self._text(v)
+                else:
+                    result[k] = self.anonymize(v)
+            return result
+        if isinstance(value, list):
+            return [self.anonymize(item) for item in value]
+        return value
+
+    def record(self, update: dict):
+        self._pending.append(json.dumps(
+            {"t": round(time.time(), 3), "update": self.anonymize(update)},
+            ensure_ascii=False, separators=(",", ":")
+        ))
+
+    def _write(self, lines: list[str]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def flush(self):
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        # Запись на диск — в потоке, чтобы не блокировать цикл событий
+        await asyncio.to_thread(self._write, lines)
+        self.recorded += len(lines)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка записи лога обновлений: {e}")
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Запись обновлений включена: {self.path}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Не записано обновлений при остановке: {e}")
+
+
+update_recorder = UpdateRecorder(
+    path=config.UPDATE_RECORDER_PATH,
+    salt=config.UPDATE_RECORDER_SALT,
+    flush_interval=config.UPDATE_RECORDER_FLUSH_INTERVAL
+)
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from config import config
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class YooKassaError(Exception):
+    def __init__(self, status: int, body: str):
+        super().__init__(f"YooKassa API error {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+class YooKassaClient:
+    """Асинхронный клиент API ЮKassa с переиспользованием соединений.
+
+    Заменяет синхронный SDK (requests) в обработчиках: запросы не блокируют
+    цикл событий, а keep-alive соединения живут в общей aiohttp-сессии."""
+
+    def __init__(self, account_id: str, secret_key: str, base_url: str,
+                 timeout: float, pool_size: int, retries: int = 2):
+        self._auth = aiohttp.BasicAuth(str(account_id or ""), secret_key or "")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        self._session = None
+        self._stats = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                auth=self._auth,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    def _record(self, operation: str, elapsed: float, error: bool):
+        stats = self._stats.setdefault(
+            operation, {"count": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0}
+        )
+        stats["count"] += 1
+        stats["total_time"] += elapsed
+        stats["max_time"] = max(stats["max_time"], elapsed)
+        if error:
+            stats["errors"] += 1
+            metrics.YOOKASSA_API_ERRORS.labels(operation).inc()
+        metrics.YOOKASSA_API_LATENCY.labels(operation).observe(elapsed)
+
+    async def _request(self, operation: str, method: str, path: str,
+                       json: dict = None, headers: dict = None) -> dict:
+        session = self._get_session()
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                async with session.request(method, f"{self.base_url}{path}",
+                                           json=json, headers=headers) as response:
+                    body = await response.text()
+                    # 202 — запрос ещё обрабатывается, 5xx — временная ошибка
+                    retryable = response.status == 202 or response.status >= 500
+                    if response.status == 200:
+                        self._record(operation, time.perf_counter() - started, False)
+                        return await response.json(content_type=None)
+                    self._record(operation, time.perf_counter() - started, True)
+                    if not retryable or attempt == self.retries:
+                        raise YooKassaError(response.status, body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._record(operation, time.perf_counter() - started, True)
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"YooKassa {operation}: {e!r}, повтор")
+            await asyncio.sleep(0.5 * (attempt + 1))
+
+    @staticmethod
+    def _payment_response(data: dict):
+        # SDK ЮKassa тянет requests и тяжёл при импорте — загружаем при первом платеже
+        from yookassa.domain.response import PaymentResponse
+        return PaymentResponse(data)
+
+    async def create_payment(self, params: dict, idempotence_key: str):
+        data = await self._request(
+            "create_payment", "POST", "/payments",
+            json=params, headers={"Idempotence-Key": idempotence_key}
+        )
+        return self._payment_response(data)
+
+    async def find_payment(self, payment_id: str):
+        data = await self._request("find_payment", "GET", f"/payments/{payment_id}")
+        return self._payment_response(data)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> dict:
+        """Количество вызовов, ошибок и задержки по операциям"""
+        return {
+            operation: {**values, "avg_time": values["total_time"] / values["count"]}
+            for operation, values in self._stats.items() if values["count"]
+        }
+
+
+yookassa_client = YooKassaClient(
+    account_id=config.ACCOUNT_ID,
+    secret_key=config.PAYMENTS_TOKEN,
+    base_url=config.YOOKASSA_API_URL,
+    timeout=config.YOOKASSA_TIMEOUT,
+    pool_size=config.YOOKASSA_POOL_SIZE
+)